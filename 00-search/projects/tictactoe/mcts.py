@@ -0,0 +1,236 @@
+"""
+Monte Carlo Tree Search player for Tic Tac Toe boards of any size.
+
+The search tree is built with the player/actions/result/terminal/utility
+functions from tictactoe.py, while random playouts run on a compact flat
+tuple so they stay fast on large boards.
+"""
+
+import math
+import multiprocessing
+import random
+import time
+
+import tictactoe as ttt
+
+# Compact cell values used during playouts
+CELL = {ttt.EMPTY: 0, ttt.X: 1, ttt.O: 2}
+
+# Default exploration constant for UCT
+EXPLORATION = math.sqrt(2)
+
+
+def lines_through(size):
+    """
+Returns, for every flat cell index of a size x size board, the list of lines
+(rows, columns, diagonals) passing through it, each as a tuple of indices.
+    """
+    lines = []
+    for i in range(size):
+        lines.append(tuple(i * size + j for j in range(size)))
+        lines.append(tuple(j * size + i for j in range(size)))
+    lines.append(tuple(i * size + i for i in range(size)))
+    lines.append(tuple(i * size + (size - 1 - i) for i in range(size)))
+
+    through = [[] for _ in range(size * size)]
+    for line in lines:
+        for index in line:
+            through[index].append(line)
+    return through
+
+
+def compact(board):
+    """Returns a board as a flat tuple of 0 (empty), 1 (X) and 2 (O)."""
+    return tuple(CELL[cell] for row in board for cell in row)
+
+
+def playout(cells, to_move, size, through, rng):
+    """
+Plays uniformly random moves on a compact board until the game ends.
+Returns the utility of the final position (1 X wins, -1 O wins, 0 tie).
+    """
+    cells = list(cells)
+    empty = [index for index, value in enumerate(cells) if value == 0]
+    rng.shuffle(empty)
+    for index in empty:
+        cells[index] = to_move
+        # Only lines through the cell just played can have been completed
+        for line in through[index]:
+            if all(cells[k] == to_move for k in line):
+                return 1 if to_move == 1 else -1
+        to_move = 3 - to_move
+    return 0
+
+
+class Node():
+    """
+A position in the search tree.
+Statistics are kept from the point of view of the player who moved into it.
+"""
+
+    def __init__(self, board, parent=None, action=None):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        self.player = ttt.player(board)   # Player to move in this position
+        self.terminal = ttt.terminal(board)
+        self.children = {}
+        self.untried = [] if self.terminal else list(ttt.actions(board))
+        self.visits = 0
+        self.wins = 0.0
+
+    def uct_child(self, exploration):
+        """Returns the child maximizing the UCT score."""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children.values(),
+            key=lambda child: (child.wins / child.visits
+                               + exploration * math.sqrt(log_visits / child.visits))
+        )
+
+
+class MCTS():
+    """
+Monte Carlo Tree Search player using UCT selection and random playouts.
+The tree is kept between calls to choose, so search effort spent on the
+position actually reached is reused on the next move.
+"""
+
+    def __init__(self, iterations=None, time_limit=None,
+                 exploration=EXPLORATION, seed=None):
+        """
+Initialize the player with a budget of iterations, seconds per move, or both.
+If neither is given, 1000 iterations are run per move.
+        """
+        if iterations is None and time_limit is None:
+            iterations = 1000
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.size = None
+        self.through = None
+
+    def find_root(self, board):
+        """
+Returns the node for board, reusing the existing tree if board is reachable
+from the previous root within two moves, or a fresh node otherwise.
+        """
+        size = len(board)
+        if self.size != size:
+            self.size = size
+            self.through = lines_through(size)
+            self.root = None
+
+        frontier = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in frontier:
+                if node.board == board:
+                    node.parent = None
+                    return node
+            frontier = [child for node in frontier
+                        for child in node.children.values()]
+        return Node(board)
+
+    def search(self, board):
+        """
+Runs MCTS from board within the configured budget.
+Returns the root node holding the accumulated statistics.
+        """
+        self.root = root = self.find_root(board)
+        deadline = (time.perf_counter() + self.time_limit
+                    if self.time_limit is not None else None)
+
+        iteration = 0
+        while True:
+            if self.iterations is not None and iteration >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            iteration += 1
+
+            # Selection: descend through fully expanded nodes
+            node = root
+            while not node.untried and node.children:
+                node = node.uct_child(self.exploration)
+
+            # Expansion: add one untried child
+            if node.untried:
+                action = node.untried.pop(self.rng.randrange(len(node.untried)))
+                child = Node(ttt.result(node.board, action), node, action)
+                node.children[action] = child
+                node = child
+
+            # Simulation: random playout on a compact board
+            if node.terminal:
+                value = ttt.utility(node.board)
+            else:
+                value = playout(compact(node.board), CELL[node.player],
+                                self.size, self.through, self.rng)
+
+            # Backpropagation: credit each node from its mover's perspective
+            while node is not None:
+                node.visits += 1
+                if node.parent is not None:
+                    mover = 1 if node.parent.player == ttt.X else -1
+                    if value == mover:
+                        node.wins += 1
+                    elif value == 0:
+                        node.wins += 0.5
+                node = node.parent
+
+        return root
+
+    def statistics(self, board):
+        """
+Searches from board and returns a dictionary mapping each action explored
+at the root to a (visits, wins) pair.
+        """
+        root = self.search(board)
+        return {action: (child.visits, child.wins)
+                for action, child in root.children.items()}
+
+    def choose(self, board):
+        """
+Returns the most visited action from board, or None if the game is over.
+        """
+        if ttt.terminal(board):
+            return None
+        statistics = self.statistics(board)
+        return max(statistics, key=lambda action: statistics[action][0])
+
+
+def worker_statistics(args):
+    """Runs an independent search in a worker process and returns its root statistics."""
+    board, iterations, time_limit, exploration, seed = args
+    player = MCTS(iterations, time_limit, exploration, seed)
+    return player.statistics(board)
+
+
+def parallel_choose(board, workers=None, iterations=None, time_limit=None,
+                    exploration=EXPLORATION, seed=None, pool=None):
+    """
+Root-parallel MCTS: runs an independent search per worker process and merges
+the visit and win counts of the root actions. Returns the most visited action.
+An existing multiprocessing pool can be passed in to avoid startup cost.
+    """
+    if ttt.terminal(board):
+        return None
+    workers = workers or multiprocessing.cpu_count()
+    base = seed if seed is not None else random.randrange(2 ** 32)
+    tasks = [(board, iterations, time_limit, exploration, base + n)
+             for n in range(workers)]
+
+    if pool is None:
+        with multiprocessing.Pool(workers) as own_pool:
+            results = own_pool.map(worker_statistics, tasks)
+    else:
+        results = pool.map(worker_statistics, tasks)
+
+    merged = {}
+    for statistics in results:
+        for action, (visits, wins) in statistics.items():
+            total_visits, total_wins = merged.get(action, (0, 0.0))
+            merged[action] = (total_visits + visits, total_wins + wins)
+    return max(merged, key=lambda action: merged[action][0])
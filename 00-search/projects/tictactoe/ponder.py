@@ -0,0 +1,196 @@
+"""
+Background pondering for the tictactoe AI.
+
+While the human chooses a move, a background thread searches the positions
+the human can reach, most likely replies first, and remembers the AI's answer
+to each. The search is minimax with a transposition table, and its choices
+match ttt.minimax. The table is shared with the foreground, so when the human
+moves the answer is often already known. Otherwise the foreground search
+reuses every position the background search finished, including the parts
+of a reply it was interrupted in.
+
+Replies are ranked by a cheap prediction of what the human will play:
+winning moves, then blocking moves, then the center, corners and edges.
+
+Usage: python ponder.py [--games N] [--think SECONDS]
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import tictactoe as ttt
+
+# Nodes searched between checks of the stop flag
+CHECK_EVERY = 64
+
+
+class Stopped(Exception):
+    """Raised inside a background search when pondering is stopped."""
+
+
+def key(board):
+    """Returns a hashable key for a board."""
+    return tuple(tuple(row) for row in board)
+
+
+def search(board, table, stop=None):
+    """
+Returns (value, best action) for the player to move, like ttt.minimax,
+storing every position searched in table. Raises Stopped if the stop event
+is set during the search; finished positions stay in the table.
+    """
+    nodes = 0
+
+    def value(board):
+        nonlocal nodes
+        k = key(board)
+        entry = table.get(k)
+        if entry is not None:
+            return entry
+        nodes += 1
+        if stop is not None and nodes % CHECK_EVERY == 0 and stop.is_set():
+            raise Stopped()
+        if ttt.terminal(board):
+            entry = (ttt.utility(board), None)
+        else:
+            maximize = ttt.player(board) == ttt.X
+            best, best_action = (float("-inf"), None) if maximize else (float("inf"), None)
+            for action in ttt.actions(board):
+                v = value(ttt.result(board, action))[0]
+                if (v > best) if maximize else (v < best):
+                    best, best_action = v, action
+            entry = (best, best_action)
+        table[k] = entry
+        return entry
+
+    return value(board)
+
+
+def likely_replies(board):
+    """
+Returns the moves available on a board, most likely first: moves that win,
+moves that block the opponent's win, then by how many lines pass through
+the cell.
+    """
+    size = len(board)
+    me = ttt.player(board)
+    them = ttt.O if me == ttt.X else ttt.X
+
+    def completes(action, mark):
+        trial = [row[:] for row in board]
+        trial[action[0]][action[1]] = mark
+        return ttt.winner(trial) == mark
+
+    def score(action):
+        i, j = action
+        lines = 2 + (i == j) + (i + j == size - 1)
+        return (completes(action, me), completes(action, them), lines)
+
+    return sorted(ttt.actions(board), key=score, reverse=True)
+
+
+class Ponderer():
+    """
+Searches the human's likely replies in a background thread and answers the
+AI's moves from what it found.
+"""
+
+    def __init__(self):
+        self.table = {}              # Board key -> (value, best action)
+        self.stop = threading.Event()
+        self.thread = None
+        self.hits = 0                # AI moves answered from pondering
+        self.misses = 0              # AI moves that needed a foreground search
+
+    def start(self, board):
+        """Starts pondering the replies to a board where the human is to move."""
+        self.halt()
+        if ttt.terminal(board):
+            return
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.ponder, args=(board, self.stop),
+                                       daemon=True)
+        self.thread.start()
+
+    def ponder(self, board, stop):
+        try:
+            for action in likely_replies(board):
+                reply = ttt.result(board, action)
+                if not ttt.terminal(reply):
+                    search(reply, self.table, stop)
+        except Stopped:
+            pass
+
+    def halt(self):
+        """Stops the background search, keeping what it found."""
+        if self.thread is not None:
+            self.stop.set()
+            self.thread.join()
+            self.thread = None
+
+    def best_move(self, board):
+        """Returns the AI's move on a board, from the table when already searched."""
+        self.halt()
+        entry = self.table.get(key(board))
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return search(board, self.table)[1]
+
+
+def play_games(games, think, mode, seed):
+    """
+Plays games where a simulated human (X) picks random moves after thinking
+for a fixed time and the AI (O) answers. mode is "off" for ttt.minimax,
+"table" for the transposition table without pondering, or "on".
+Returns the AI's move latencies in seconds and the ponderer, if any.
+    """
+    rng = random.Random(seed)
+    ponderer = Ponderer() if mode != "off" else None
+    ponder = mode == "on"
+    latencies = []
+    for _ in range(games):
+        board = ttt.initial_state()
+        if ponder:
+            ponderer.start(board)
+        while not ttt.terminal(board):
+            time.sleep(think)
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+            if ttt.terminal(board):
+                break
+            start = time.perf_counter()
+            move = ponderer.best_move(board) if ponderer else ttt.minimax(board)
+            latencies.append(time.perf_counter() - start)
+            board = ttt.result(board, move)
+            if ponder:
+                ponderer.start(board)
+        if ponderer is not None:
+            ponderer.halt()
+    return latencies, ponderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure AI move latency with and without pondering.")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="seconds the simulated human takes per move")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for mode in ("off", "table", "on"):
+        latencies, ponderer = play_games(args.games, args.think, mode, args.seed)
+        latencies_ms = sorted(1000 * s for s in latencies)
+        line = (f"pondering {mode:5}: {len(latencies)} AI moves, "
+                f"median {statistics.median(latencies_ms):.1f} ms, "
+                f"max {latencies_ms[-1]:.1f} ms")
+        if mode == "on":
+            line += f", {ponderer.hits} answered from pondering"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
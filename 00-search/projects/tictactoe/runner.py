@@ -1,155 +1,314 @@
-import pygame
-import sys
+"""
+Tic Tac Toe runner.
+
+Runs the pygame interface by default. With --headless the same game logic is
+driven by commands read from stdin, one per line, and the state is written to
+stdout as JSON lines, so no display or pygame import is needed:
+
+    play X|O      choose a side (the AI moves first if you play O)
+    move I J      play the cell at row I, column J
+    show          print the current state
+    reset         start over
+    quit          exit
+
+With --ponder the computer searches your likely replies while you think (see
+ponder.py), so it usually answers at once.
+"""
+
 import time
 
+# Recorded before anything else so startup time covers all imports
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import sys
+
 import tictactoe as ttt
+from ponder import Ponderer
 
-# Initialize pygame and set up display
-pygame.init()
-size = width, height = 600, 400
-
-# Color definitions
-black = (0, 0, 0)
-white = (255, 255, 255)
-
-screen = pygame.display.set_mode(size)
-
-# Font setup for UI elements
-mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
-largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
-
-# Game state variables
-user = None  # Tracks whether user is X or O
-board = ttt.initial_state()  # Initial empty board
-ai_turn = False  # Tracks if it's AI's turn
-
-# Main game loop
-while True:
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-
-    # Clear screen
-    screen.fill(black)
-
-    # Player selection screen
-    if user is None:
-        # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-
-        # Draw player selection buttons
-        playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
-        playX = mediumFont.render("Play as X", True, black)
-        playXRect = playX.get_rect()
-        playXRect.center = playXButton.center
-        pygame.draw.rect(screen, white, playXButton)
-        screen.blit(playX, playXRect)
-
-        playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
-        playO = mediumFont.render("Play as O", True, black)
-        playORect = playO.get_rect()
-        playORect.center = playOButton.center
-        pygame.draw.rect(screen, white, playOButton)
-        screen.blit(playO, playORect)
-
-        # Handle button clicks
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)  # Debounce
-                user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.O
 
-    else:
-        # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
-        tiles = []
-        for i in range(3):
-            row = []
-            for j in range(3):
-                # Create rectangle for each tile
-                rect = pygame.Rect(
-                    tile_origin[0] + j * tile_size,
-                    tile_origin[1] + i * tile_size,
-                    tile_size, tile_size
-                )
-                pygame.draw.rect(screen, white, rect, 3)
-
-                # Draw X or O if tile is occupied
-                if board[i][j] != ttt.EMPTY:
-                    move = moveFont.render(board[i][j], True, white)
-                    moveRect = move.get_rect()
-                    moveRect.center = rect.center
-                    screen.blit(move, moveRect)
-                row.append(rect)
-            tiles.append(row)
-
-        # Check game state
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
-
-        # Display game status
-        if game_over:
-            winner = ttt.winner(board)
-            if winner is None:
-                title = f"Game Over: Tie."
-            else:
-                title = f"Game Over: {winner} wins."
-        elif user == player:
-            title = f"Play as {user}"
+class Game():
+    """
+Game state shared by the graphical and headless front ends.
+Tracks the board and which side the user plays; the computer plays the other.
+"""
+
+    def __init__(self, ponder=False):
+        self.ponderer = Ponderer() if ponder else None
+        self.reset()
+
+    def reset(self):
+        """Starts a new game with no side chosen."""
+        if self.ponderer is not None:
+            self.ponderer.halt()
+        self.user = None  # Tracks whether user is X or O
+        self.board = ttt.initial_state()  # Initial empty board
+
+    def choose(self, user):
+        """Sets the user's side."""
+        if user not in (ttt.X, ttt.O):
+            raise ValueError("side must be X or O")
+        self.user = user
+        self.ponder()
+
+    def game_over(self):
+        """Checks whether the game has ended."""
+        return ttt.terminal(self.board)
+
+    def ai_turn(self):
+        """Checks whether the computer should move next."""
+        return (self.user is not None and not self.game_over()
+                and ttt.player(self.board) != self.user)
+
+    def play(self, action):
+        """Plays the user's move."""
+        if self.user is None or self.ai_turn() or self.game_over():
+            raise ValueError("not your turn")
+        self.board = ttt.result(self.board, action)
+
+    def ai_move(self):
+        """Plays and returns the computer's move."""
+        if self.ponderer is not None:
+            move = self.ponderer.best_move(self.board)
         else:
-            title = f"Computer thinking..."
-        title = largeFont.render(title, True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 30)
-        screen.blit(title, titleRect)
-
-        # AI move logic
-        if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)  # Simulate thinking
-                move = ttt.minimax(board)  # Get AI move
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            move = ttt.minimax(self.board)
+        self.board = ttt.result(self.board, move)
+        self.ponder()
+        return move
 
-        # Player move handling
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
-
-        # Game over screen
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
+    def ponder(self):
+        """Starts searching the user's replies in the background, if enabled."""
+        if self.ponderer is not None and not self.ai_turn():
+            self.ponderer.start(self.board)
+
+    def state(self):
+        """Returns a JSON-serializable description of the game."""
+        return {
+            "user": self.user,
+            "board": self.board,
+            "player": ttt.player(self.board),
+            "terminal": self.game_over(),
+            "winner": ttt.winner(self.board),
+        }
+
+
+def run_headless(commands=sys.stdin, output=sys.stdout, ponder=False):
+    """
+Plays games from text commands (see module docstring) and writes the state
+after each command as a JSON line.
+    """
+    game = Game(ponder)
+    for line in commands:
+        words = line.split()
+        if not words:
+            continue
+        command = words[0].lower()
+        try:
+            if command == "quit":
+                break
+            elif command == "reset":
+                game.reset()
+            elif command == "play":
+                game.choose(words[1].upper())
+            elif command == "move":
+                game.play((int(words[1]), int(words[2])))
+            elif command != "show":
+                raise ValueError(f"unknown command {command}")
+
+            # The computer replies immediately
+            if game.ai_turn():
+                game.ai_move()
+            reply = game.state()
+        except Exception as e:
+            reply = {"error": str(e)}
+        output.write(json.dumps(reply) + "\n")
+        output.flush()
+
+
+def run_gui(report_startup=False, ponder=False):
+    """Opens the pygame window and runs the interactive game loop."""
+    import pygame
+
+    # Initialize pygame and set up display
+    pygame.init()
+    size = width, height = 600, 400
+
+    # Color definitions
+    black = (0, 0, 0)
+    white = (255, 255, 255)
+
+    screen = pygame.display.set_mode(size)
+
+    # Font setup for UI elements
+    mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
+    largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
+    moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+    # Game state variables
+    game = Game(ponder)
+    ai_turn = False  # Tracks if it's AI's turn
+    first_frame = True
+
+    # Main game loop
+    while True:
+        # Event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sys.exit()
+
+        # Clear screen
+        screen.fill(black)
+
+        # Player selection screen
+        if game.user is None:
+            # Draw title
+            title = largeFont.render("Play Tic-Tac-Toe", True, white)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 50)
+            screen.blit(title, titleRect)
+
+            # Draw player selection buttons
+            playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
+            playX = mediumFont.render("Play as X", True, black)
+            playXRect = playX.get_rect()
+            playXRect.center = playXButton.center
+            pygame.draw.rect(screen, white, playXButton)
+            screen.blit(playX, playXRect)
+
+            playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
+            playO = mediumFont.render("Play as O", True, black)
+            playORect = playO.get_rect()
+            playORect.center = playOButton.center
+            pygame.draw.rect(screen, white, playOButton)
+            screen.blit(playO, playORect)
+
+            # Handle button clicks
             click, _, _ = pygame.mouse.get_pressed()
             if click == 1:
                 mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
+                if playXButton.collidepoint(mouse):
+                    time.sleep(0.2)  # Debounce
+                    game.choose(ttt.X)
+                elif playOButton.collidepoint(mouse):
                     time.sleep(0.2)
-                    # Reset game state
-                    user = None
-                    board = ttt.initial_state()
+                    game.choose(ttt.O)
+
+        else:
+            board = game.board
+
+            # Draw game board
+            tile_size = 80
+            tile_origin = (width / 2 - (1.5 * tile_size),
+                           height / 2 - (1.5 * tile_size))
+            tiles = []
+            for i in range(3):
+                row = []
+                for j in range(3):
+                    # Create rectangle for each tile
+                    rect = pygame.Rect(
+                        tile_origin[0] + j * tile_size,
+                        tile_origin[1] + i * tile_size,
+                        tile_size, tile_size
+                    )
+                    pygame.draw.rect(screen, white, rect, 3)
+
+                    # Draw X or O if tile is occupied
+                    if board[i][j] != ttt.EMPTY:
+                        move = moveFont.render(board[i][j], True, white)
+                        moveRect = move.get_rect()
+                        moveRect.center = rect.center
+                        screen.blit(move, moveRect)
+                    row.append(rect)
+                tiles.append(row)
+
+            # Check game state
+            game_over = game.game_over()
+            player = ttt.player(board)
+
+            # Display game status
+            if game_over:
+                winner = ttt.winner(board)
+                if winner is None:
+                    title = f"Game Over: Tie."
+                else:
+                    title = f"Game Over: {winner} wins."
+            elif game.user == player:
+                title = f"Play as {game.user}"
+            else:
+                title = f"Computer thinking..."
+            title = largeFont.render(title, True, white)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 30)
+            screen.blit(title, titleRect)
+
+            # AI move logic
+            if game.ai_turn():
+                if ai_turn:
+                    time.sleep(0.5)  # Simulate thinking
+                    game.ai_move()
                     ai_turn = False
+                else:
+                    ai_turn = True
+
+            # Player move handling
+            click, _, _ = pygame.mouse.get_pressed()
+            if click == 1 and game.user == player and not game_over:
+                mouse = pygame.mouse.get_pos()
+                for i in range(3):
+                    for j in range(3):
+                        if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
+                            game.play((i, j))
+
+            # Game over screen
+            if game_over:
+                againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+                again = mediumFont.render("Play Again", True, black)
+                againRect = again.get_rect()
+                againRect.center = againButton.center
+                pygame.draw.rect(screen, white, againButton)
+                screen.blit(again, againRect)
+                click, _, _ = pygame.mouse.get_pressed()
+                if click == 1:
+                    mouse = pygame.mouse.get_pos()
+                    if againButton.collidepoint(mouse):
+                        time.sleep(0.2)
+                        # Reset game state
+                        game.reset()
+                        ai_turn = False
+
+        # Update display
+        pygame.display.flip()
+
+        if first_frame:
+            first_frame = False
+            if report_startup:
+                report_startup_time("gui")
+
+
+def report_startup_time(mode):
+    """Prints the time from process start until the runner was ready."""
+    elapsed = time.perf_counter() - STARTED
+    print(f"{mode} startup: {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe against the computer.")
+    parser.add_argument("--headless", action="store_true",
+                        help="read commands from stdin instead of opening a window")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="report how long startup took on stderr")
+    parser.add_argument("--ponder", action="store_true",
+                        help="search the user's likely replies while they think")
+    args = parser.parse_args()
+
+    if args.headless:
+        if args.startup_time:
+            report_startup_time("headless")
+        run_headless(ponder=args.ponder)
+    else:
+        run_gui(args.startup_time, args.ponder)
+
 
-    # Update display
-    pygame.display.flip()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Retrograde-analysis endgame tablebase for Tic Tac Toe.
+
+The build step enumerates every legal position of a size x size board
+(4x4 by default) and solves them backward, from full boards down to the empty
+board, so each position is evaluated exactly once. Values are packed at
+2 bits per position and indexed directly by the position's base-3 rank, so the
+index needs no storage of its own. Queries memory-map the file and derive the
+best move from the values of the child positions.
+
+Usage:
+    python tablebase.py build [--size N] [--output FILE]
+    python tablebase.py bench [--input FILE] [--queries N]
+"""
+
+import argparse
+import itertools
+import mmap
+import os
+import random
+import struct
+import time
+
+import tictactoe as ttt
+
+# File header: magic, format version, board size
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sBB")
+
+# 2-bit position values, ordered so that X prefers larger values
+UNKNOWN = 0   # Illegal or unreachable position
+O_WINS = 1
+DRAW = 2
+X_WINS = 3
+
+# Utility of each stored value
+UTILITY = {O_WINS: -1, DRAW: 0, X_WINS: 1}
+
+
+def default_path(size):
+    """Returns the default tablebase file name for a board size."""
+    return f"tictactoe{size}.tb"
+
+
+def line_masks(size):
+    """Returns bitmasks of all rows, columns and diagonals of the board."""
+    lines = []
+    for i in range(size):
+        lines.append(sum(1 << (i * size + j) for j in range(size)))
+        lines.append(sum(1 << (j * size + i) for j in range(size)))
+    lines.append(sum(1 << (i * size + i) for i in range(size)))
+    lines.append(sum(1 << (i * size + size - 1 - i) for i in range(size)))
+    return lines
+
+
+def has_line(mask, lines):
+    """Checks whether a player's bitmask fills any line."""
+    return any(mask & line == line for line in lines)
+
+
+def build(size=4):
+    """
+Solves every legal position of a size x size board.
+Returns a bytearray holding one value per base-3 rank and the number of
+legal positions solved.
+
+A position is legal when X has as many marks as O or one more, at most one
+player has a line, and the player with a line made the last move.
+    """
+    cells = size * size
+    lines = line_masks(size)
+    powers = [3 ** i for i in range(cells)]
+
+    # weight[mask] is the base-3 rank contribution of the cells set in mask
+    weight = [0] * (1 << cells)
+    for mask in range(1, 1 << cells):
+        low = mask & -mask
+        weight[mask] = weight[mask ^ low] + powers[low.bit_length() - 1]
+
+    values = bytearray(3 ** cells)
+    solved = 0
+
+    # Solve layers from the full board back to the empty one: every child of
+    # a position lies in the next layer, which is already solved
+    for marks in range(cells, -1, -1):
+        x_count = (marks + 1) // 2
+        o_count = marks // 2
+        x_to_move = x_count == o_count
+
+        for x_cells in itertools.combinations(range(cells), x_count):
+            x_mask = sum(1 << i for i in x_cells)
+            x_line = has_line(x_mask, lines)
+            if x_line and x_to_move:
+                continue  # X cannot have won if O moved last
+            free = [i for i in range(cells) if not x_mask >> i & 1]
+
+            for o_cells in itertools.combinations(free, o_count):
+                o_mask = sum(1 << i for i in o_cells)
+                rank = weight[x_mask] + 2 * weight[o_mask]
+                solved += 1
+
+                if x_line:
+                    if has_line(o_mask, lines):
+                        solved -= 1
+                        continue
+                    values[rank] = X_WINS
+                    continue
+                if has_line(o_mask, lines):
+                    if not x_to_move:
+                        solved -= 1
+                        continue
+                    values[rank] = O_WINS
+                    continue
+                if marks == cells:
+                    values[rank] = DRAW
+                    continue
+
+                # Back up the best child value for the player to move
+                empty = [i for i in free if not o_mask >> i & 1]
+                if x_to_move:
+                    best = O_WINS
+                    for i in empty:
+                        value = values[rank + powers[i]]
+                        if value > best:
+                            best = value
+                            if best == X_WINS:
+                                break
+                else:
+                    best = X_WINS
+                    for i in empty:
+                        value = values[rank + 2 * powers[i]]
+                        if value < best:
+                            best = value
+                            if best == O_WINS:
+                                break
+                values[rank] = best
+
+    return values, solved
+
+
+def pack(values):
+    """Packs one 2-bit value per position, four positions per byte."""
+    packed = bytearray((len(values) + 3) // 4)
+    for rank in range(0, len(values), 4):
+        chunk = values[rank:rank + 4]
+        byte = 0
+        for shift, value in enumerate(chunk):
+            byte |= value << (2 * shift)
+        packed[rank // 4] = byte
+    return packed
+
+
+def write(path, size, values):
+    """Writes a packed tablebase file. Returns its size in bytes."""
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size))
+        f.write(pack(values))
+    return os.path.getsize(path)
+
+
+class Tablebase():
+    """
+Memory-mapped tablebase queried with ordinary tictactoe boards.
+"""
+
+    def __init__(self, path):
+        """Opens and memory-maps a tablebase file."""
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        self.powers = [3 ** i for i in range(self.size * self.size)]
+
+    def close(self):
+        """Releases the memory map and file."""
+        self.data.close()
+        self.file.close()
+
+    def rank(self, board):
+        """Returns the base-3 index of a board."""
+        if len(board) != self.size:
+            raise ValueError(f"tablebase is for {self.size}x{self.size} boards")
+        rank = 0
+        index = 0
+        for row in board:
+            for cell in row:
+                if cell == ttt.X:
+                    rank += self.powers[index]
+                elif cell == ttt.O:
+                    rank += 2 * self.powers[index]
+                index += 1
+        return rank
+
+    def lookup(self, rank):
+        """Returns the stored 2-bit value of a position rank."""
+        byte = self.data[HEADER.size + rank // 4]
+        return (byte >> (2 * (rank % 4))) & 3
+
+    def value(self, board):
+        """
+Returns the game-theoretic utility of board with perfect play
+(1 X wins, -1 O wins, 0 tie), or None if the position is not legal.
+        """
+        return UTILITY.get(self.lookup(self.rank(board)))
+
+    def best_move(self, board):
+        """
+Returns an optimal action for the player to move, or None if the game is over.
+Each candidate is scored by looking up the position it leads to.
+        """
+        if ttt.terminal(board):
+            return None
+        rank = self.rank(board)
+        x_to_move = ttt.player(board) == ttt.X
+        digit = 1 if x_to_move else 2
+
+        best_action = None
+        best_value = None
+        for action in sorted(ttt.actions(board)):
+            value = self.lookup(rank + digit * self.powers[action[0] * self.size + action[1]])
+            if (best_value is None
+                    or (x_to_move and value > best_value)
+                    or (not x_to_move and value < best_value)):
+                best_action, best_value = action, value
+        return best_action
+
+
+def random_position(size, rng):
+    """Returns a random non-terminal position reached by random play."""
+    while True:
+        board = ttt.initial_state(size)
+        for _ in range(rng.randrange(size * size)):
+            if ttt.terminal(board):
+                break
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+        if not ttt.terminal(board):
+            return board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a Tic Tac Toe tablebase.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="solve all positions and write the table")
+    build_parser.add_argument("--size", type=int, default=4)
+    build_parser.add_argument("--output")
+
+    bench_parser = commands.add_parser("bench", help="measure lookup latency")
+    bench_parser.add_argument("--input", default=default_path(4))
+    bench_parser.add_argument("--queries", type=int, default=10000)
+    bench_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        output = args.output or default_path(args.size)
+        start = time.perf_counter()
+        values, solved = build(args.size)
+        solve_time = time.perf_counter() - start
+        file_size = write(output, args.size, values)
+        print(f"Solved {solved} legal positions in {solve_time:.1f}s")
+        print(f"Wrote {output}: {file_size} bytes "
+              f"({8 * (file_size - HEADER.size) / len(values):.2f} bits per index)")
+        print(f"Value of the empty board: {UTILITY[values[0]]}")
+
+    else:
+        table = Tablebase(args.input)
+        rng = random.Random(args.seed)
+        boards = [random_position(table.size, rng) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        for board in boards:
+            table.value(board)
+        value_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for board in boards:
+            table.best_move(board)
+        move_time = time.perf_counter() - start
+
+        print(f"value():     {1e6 * value_time / len(boards):.2f} us per query")
+        print(f"best_move(): {1e6 * move_time / len(boards):.2f} us per query")
+        table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,13 +10,11 @@ X = "X"
 O = "O"
 EMPTY = None
 
-def initial_state():
+def initial_state(size=3):
     """
-Returns starting state of the board (3x3 grid of EMPTY).
+Returns starting state of the board (size x size grid of EMPTY, 3x3 by default).
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * size for _ in range(size)]
 
 def player(board):
     """
@@ -46,7 +44,8 @@ def result(board, action):
 Returns new board state after making a move.
 Validates action and raises exceptions for invalid moves.
     """
-    if action[0] < 0 or action[0] > 2 or action[1] < 0 or action[1] > 2:
+    size = len(board)
+    if action[0] < 0 or action[0] >= size or action[1] < 0 or action[1] >= size:
         raise Exception("Invalid coordinates")
     elif board[action[0]][action[1]] != EMPTY:
         raise Exception("Position already occupied")
@@ -59,20 +58,24 @@ Validates action and raises exceptions for invalid moves.
 def winner(board):
     """
 Checks all rows, columns, and diagonals for a winner.
+A player wins by filling a whole line, on a board of any size.
 Returns X, O, or None if no winner yet.
     """
+    size = len(board)
+
     # Check rows and columns
-    for i in range(3):
-        if board[i][0] != EMPTY and board[i][0] == board[i][1] == board[i][2]:
+    for i in range(size):
+        if board[i][0] != EMPTY and all(board[i][j] == board[i][0] for j in range(size)):
             return board[i][0]
-        if board[0][i] != EMPTY and board[0][i] == board[1][i] == board[2][i]:
+        if board[0][i] != EMPTY and all(board[j][i] == board[0][i] for j in range(size)):
             return board[0][i]
 
     # Check diagonals
-    if board[0][0] != EMPTY and board[0][0] == board[1][1] == board[2][2]:
+    if board[0][0] != EMPTY and all(board[i][i] == board[0][0] for i in range(size)):
         return board[0][0]
-    if board[0][2] != EMPTY and board[0][2] == board[1][1] == board[2][0]:
-        return board[0][2]
+    last = size - 1
+    if board[0][last] != EMPTY and all(board[i][last - i] == board[0][last] for i in range(size)):
+        return board[0][last]
 
     return None
 
@@ -0,0 +1,400 @@
+"""
+Binary decision diagrams for logic.py knowledge bases.
+
+compile_kb turns a Sentence into a reduced ordered BDD once. After that,
+entailment, model counting and conditioning on evidence are operations on
+the graph, instead of a fresh enumeration of every model per query as in
+model_check.
+
+Nodes live in a BDD manager and are plain integers: 0 is false, 1 is true,
+and every other node tests one variable and points to a low (false) and a high
+(true) child. A unique table guarantees that equal functions are the same
+node, and a computed table caches the results of apply.
+
+Usage: python bdd.py [--characters N] [--statements M] [--seed S]
+"""
+
+import argparse
+import functools
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+FALSE = 0
+TRUE = 1
+
+# Default limits on the number of nodes and computed-table entries
+MAX_NODES = 1_000_000
+MAX_CACHE = 1_000_000
+
+
+class NodeLimitExceeded(Exception):
+    """Raised when a diagram would need more nodes than the manager allows."""
+
+
+def ordering(sentence, method="appearance"):
+    """
+Returns the symbol names of a sentence in the order the BDD should test them.
+"appearance" orders symbols by a depth-first walk of the sentence, which keeps
+symbols that occur together close in the order; "frequency" puts the most
+often used symbols first.
+    """
+    seen = {}
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Symbol):
+            seen[node.name] = seen.get(node.name, 0) + 1
+        elif isinstance(node, Not):
+            stack.append(node.operand)
+        elif isinstance(node, And):
+            stack.extend(reversed(node.conjuncts))
+        elif isinstance(node, Or):
+            stack.extend(reversed(node.disjuncts))
+        elif isinstance(node, Implication):
+            stack.extend((node.consequent, node.antecedent))
+        elif isinstance(node, Biconditional):
+            stack.extend((node.right, node.left))
+        else:
+            raise TypeError(f"cannot order {type(node).__name__}")
+
+    if method == "appearance":
+        return list(seen)
+    if method == "frequency":
+        return sorted(seen, key=lambda name: -seen[name])
+    raise ValueError(f"unknown ordering {method}")
+
+
+class BDD():
+    """
+Node store shared by all diagrams over one variable order.
+"""
+
+    def __init__(self, order=(), max_nodes=MAX_NODES, max_cache=MAX_CACHE):
+        """
+Initialize a manager holding only the two terminals.
+Variables not in order are appended to it when first used.
+        """
+        self.order = []
+        self.levels = {}
+        for name in order:
+            self.add_variable(name)
+
+        # Node k tests variable level[k]; terminals sit below every variable
+        self.level = [float("inf"), float("inf")]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+
+        # (level, low, high) -> node, so every function has one node
+        self.unique = {}
+
+        # (operation, u, v) -> node
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+        self.max_nodes = max_nodes
+        self.max_cache = max_cache
+
+    def __len__(self):
+        """Returns the number of nodes in the manager, terminals included."""
+        return len(self.level)
+
+    def add_variable(self, name):
+        """Appends a variable to the order if it is not already in it."""
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+        return self.levels[name]
+
+    def node(self, level, low, high):
+        """Returns the node testing a level with the given children, creating it if needed."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            if len(self.level) >= self.max_nodes:
+                raise NodeLimitExceeded(f"more than {self.max_nodes} BDD nodes")
+            node = len(self.level)
+            self.level.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+
+    def variable(self, name):
+        """Returns the diagram of a single variable."""
+        return self.node(self.add_variable(name), FALSE, TRUE)
+
+    def remember(self, key, node):
+        """Stores a result in the computed table, emptying it when it is full."""
+        if len(self.cache) >= self.max_cache:
+            self.cache.clear()
+        self.cache[key] = node
+        return node
+
+    def negate(self, u):
+        """Returns the diagram of ¬u."""
+        if u <= TRUE:
+            return TRUE - u
+        key = ("not", u)
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+        return self.remember(key, self.node(
+            self.level[u], self.negate(self.low[u]), self.negate(self.high[u])
+        ))
+
+    def apply(self, operation, u, v):
+        """
+Combines two diagrams with "and", "or" or "xor".
+Terminal cases are settled directly; otherwise both diagrams are split on
+their topmost variable and the halves combined recursively.
+        """
+        if operation == "and":
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif operation == "or":
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        elif operation == "xor":
+            if u == v:
+                return FALSE
+            if u == FALSE:
+                return v
+            if v == FALSE:
+                return u
+            if u == TRUE:
+                return self.negate(v)
+            if v == TRUE:
+                return self.negate(u)
+        else:
+            raise ValueError(f"unknown operation {operation}")
+
+        # All three operations are commutative
+        if u > v:
+            u, v = v, u
+        key = (operation, u, v)
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+
+        level = min(self.level[u], self.level[v])
+        u_low, u_high = (self.low[u], self.high[u]) if self.level[u] == level else (u, u)
+        v_low, v_high = (self.low[v], self.high[v]) if self.level[v] == level else (v, v)
+        return self.remember(key, self.node(
+            level,
+            self.apply(operation, u_low, v_low),
+            self.apply(operation, u_high, v_high),
+        ))
+
+    def compile(self, sentence):
+        """Returns the diagram of a logic.Sentence."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return self.negate(self.compile(sentence.operand))
+        if isinstance(sentence, And):
+            result = TRUE
+            for conjunct in sentence.conjuncts:
+                result = self.apply("and", result, self.compile(conjunct))
+                if result == FALSE:
+                    break
+            return result
+        if isinstance(sentence, Or):
+            result = FALSE
+            for disjunct in sentence.disjuncts:
+                result = self.apply("or", result, self.compile(disjunct))
+                if result == TRUE:
+                    break
+            return result
+        if isinstance(sentence, Implication):
+            return self.apply("or", self.negate(self.compile(sentence.antecedent)),
+                              self.compile(sentence.consequent))
+        if isinstance(sentence, Biconditional):
+            return self.negate(self.apply("xor", self.compile(sentence.left),
+                                          self.compile(sentence.right)))
+        raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+    def restrict(self, u, evidence):
+        """
+Returns the diagram of u with some variables fixed.
+evidence maps variable names to truth values.
+        """
+        fixed = {self.levels[name]: value for name, value in evidence.items()
+                 if name in self.levels}
+        memo = {}
+
+        def walk(u):
+            if u <= TRUE:
+                return u
+            if u not in memo:
+                level = self.level[u]
+                if level in fixed:
+                    memo[u] = walk(self.high[u] if fixed[level] else self.low[u])
+                else:
+                    memo[u] = self.node(level, walk(self.low[u]), walk(self.high[u]))
+            return memo[u]
+
+        return walk(u)
+
+    def count(self, u, variables):
+        """
+Returns the number of assignments to the first `variables` variables of the
+order that satisfy u. u must not test any later variable.
+        """
+        memo = {FALSE: 0, TRUE: 1}
+
+        def level(node):
+            return variables if node <= TRUE else self.level[node]
+
+        def walk(u):
+            if u not in memo:
+                low, high = self.low[u], self.high[u]
+                memo[u] = (walk(low) << (level(low) - self.level[u] - 1)) + \
+                          (walk(high) << (level(high) - self.level[u] - 1))
+            return memo[u]
+
+        return walk(u) << level(u)
+
+    def size(self, u):
+        """Returns the number of nodes reachable from u, terminals included."""
+        seen = set()
+        stack = [u]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                if node > TRUE:
+                    stack.append(self.low[node])
+                    stack.append(self.high[node])
+        return len(seen)
+
+    def stats(self):
+        """Returns node and computed-table counts."""
+        return {
+            "variables": len(self.order),
+            "nodes": len(self),
+            "cache_entries": len(self.cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+class Diagram():
+    """
+A compiled knowledge base: the root of its diagram in a BDD manager, and the
+variables it is counted over.
+"""
+
+    def __init__(self, bdd, root, variables, evidence=None):
+        self.bdd = bdd
+        self.root = root
+        self.variables = variables          # Models are counted over this many leading variables
+        self.evidence = evidence or {}      # Truth values fixed by conditioning
+
+    def satisfiable(self):
+        """Returns True if the knowledge base has a model."""
+        return self.root != FALSE
+
+    def entails(self, query):
+        """Returns True if every model of the knowledge base satisfies the query."""
+        q = self.bdd.restrict(self.bdd.compile(query), self.evidence)
+        return self.bdd.apply("and", self.root, self.bdd.negate(q)) == FALSE
+
+    def count(self):
+        """
+Returns the number of models of the knowledge base over its symbols, not
+counting symbols fixed by conditioning.
+        """
+        fixed = sum(1 for name in self.evidence
+                    if self.bdd.levels.get(name, self.variables) < self.variables)
+        return self.bdd.count(self.root, self.variables) >> fixed
+
+    def condition(self, evidence):
+        """
+Returns the knowledge base with some symbols fixed to the given truth values.
+Queries against the result are conditioned on the same evidence, so they
+behave as if the evidence had been added to the knowledge base.
+        """
+        root = self.bdd.restrict(self.root, evidence)
+        return Diagram(self.bdd, root, self.variables, {**self.evidence, **evidence})
+
+    def size(self):
+        """Returns the number of nodes in the diagram."""
+        return self.bdd.size(self.root)
+
+
+def compile_kb(knowledge, order="appearance", max_nodes=MAX_NODES, max_cache=MAX_CACHE):
+    """
+Compiles a knowledge base into a Diagram.
+order is an ordering method name (see ordering) or an explicit list of names.
+Raises NodeLimitExceeded if the diagram grows beyond max_nodes.
+    """
+    if isinstance(order, str):
+        order = ordering(knowledge, order)
+    bdd = BDD(order, max_nodes, max_cache)
+    root = bdd.compile(knowledge)
+    return Diagram(bdd, root, len(bdd.order))
+
+
+@functools.lru_cache(maxsize=16)
+def compiled(knowledge):
+    """Returns the diagram of a knowledge base, compiling it on first use."""
+    return compile_kb(knowledge)
+
+
+def entails(knowledge, query):
+    """
+Drop-in replacement for model_check that compiles each knowledge base once
+and reuses the diagram for later queries against it.
+    """
+    return compiled(knowledge).entails(query)
+
+
+def main():
+    from generator import generate
+
+    parser = argparse.ArgumentParser(description="Compile a generated puzzle into a BDD.")
+    parser.add_argument("--characters", type=int, default=20)
+    parser.add_argument("--statements", type=int, default=30)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--order", choices=["appearance", "frequency"], default="appearance")
+    parser.add_argument("--max-nodes", type=int, default=MAX_NODES)
+    args = parser.parse_args()
+
+    puzzle = generate(args.characters, args.statements, args.depth, args.seed)
+
+    start = time.perf_counter()
+    try:
+        diagram = compile_kb(puzzle.knowledge, args.order, args.max_nodes)
+    except NodeLimitExceeded as e:
+        print(f"Could not compile: {e}")
+        return
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    entailed = [query for query in puzzle.queries() if diagram.entails(query)]
+    query_time = time.perf_counter() - start
+
+    print(f"Compiled {len(diagram.bdd.order)} symbols in {compile_time * 1000:.2f} ms: "
+          f"{diagram.size()} nodes in the diagram, {diagram.count()} models")
+    print(f"{len(puzzle.queries())} queries in {query_time * 1000:.2f} ms, "
+          f"{len(entailed)} entailed")
+    print(diagram.bdd.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Scaling benchmark for the entailment backends.
+
+Generates random knights-and-knaves puzzles of growing size with generator.py
+and asks every backend in BACKENDS whether the knowledge base entails each
+role symbol. Answers are checked against the puzzle's hidden roles and against
+the other backends. A backend that exceeds the time budget on one size is not
+run on larger ones, and the run fails.
+
+Results are written as CSV or JSON, one row per backend and size.
+
+Usage: python benchmark.py [--characters N ...] [--budget SECONDS] [--format csv|json]
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+import bdd
+import horn
+from generator import generate
+from logic import model_check
+
+# Entailment backends: name -> function(knowledge, query) returning a bool
+BACKENDS = {
+    "model_check": model_check,
+    "bdd": bdd.entails,
+    "horn": horn.entails,
+}
+
+# Columns of the results table
+FIELDS = ["backend", "characters", "symbols", "statements", "queries",
+          "entailed", "seconds", "ms_per_query", "correct", "status"]
+
+
+def run_backend(entails, puzzle):
+    """
+Asks one backend every query of a puzzle.
+Returns the answers and the total time taken.
+    """
+    answers = []
+    start = time.perf_counter()
+    for query in puzzle.queries():
+        answers.append(entails(puzzle.knowledge, query))
+    return answers, time.perf_counter() - start
+
+
+def run(sizes, statements_per_character, depth, seed, budget, backends):
+    """
+Benchmarks the backends on one puzzle per size.
+Returns the result rows and whether every backend stayed within budget and
+answered correctly.
+    """
+    rows = []
+    passed = True
+    over_budget = set()
+
+    for characters in sizes:
+        statements = max(1, round(statements_per_character * characters))
+        puzzle = generate(characters, statements, depth, seed + characters)
+        reference = None
+
+        for name in backends:
+            row = {"backend": name, "characters": characters,
+                   "symbols": 2 * characters, "statements": statements,
+                   "queries": len(puzzle.queries())}
+            if name in over_budget:
+                rows.append({**row, "status": "skipped"})
+                continue
+
+            answers, seconds = run_backend(BACKENDS[name], puzzle)
+
+            # Entailed symbols must hold in the hidden roles, and all
+            # backends must agree with the first one
+            correct = all(puzzle.solution[query.name]
+                          for query, entailed in zip(puzzle.queries(), answers)
+                          if entailed)
+            if reference is None:
+                reference = answers
+            correct = correct and answers == reference
+
+            status = "ok"
+            if seconds > budget:
+                status = "over budget"
+                over_budget.add(name)
+            if not correct or status != "ok":
+                passed = False
+
+            rows.append({**row, "entailed": sum(answers),
+                         "seconds": round(seconds, 6),
+                         "ms_per_query": round(1000 * seconds / len(answers), 4),
+                         "correct": correct, "status": status})
+    return rows, passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time entailment backends on growing puzzles.")
+    parser.add_argument("--characters", type=int, nargs="+", default=[2, 3, 4, 5, 6, 7],
+                        help="puzzle sizes to run")
+    parser.add_argument("--statements", type=float, default=1.5,
+                        help="statements per character")
+    parser.add_argument("--depth", type=int, default=2,
+                        help="maximum nesting of connectives in a statement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=10,
+                        help="seconds allowed per backend on one puzzle")
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--output", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, passed = run(args.characters, args.statements, args.depth,
+                       args.seed, args.budget, args.backend)
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(output, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump({"budget": args.budget, "passed": passed, "results": rows},
+                      output, indent=2)
+            output.write("\n")
+    finally:
+        if args.output:
+            output.close()
+
+    print("PASS" if passed else "FAIL", file=sys.stderr)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Persistent cache of entailment results.
+
+EntailmentCache remembers whether a knowledge base entails a query in an
+SQLite file, so the same question asked again, in this process or a later
+one, is answered without building any models. A hit costs one serialization
+of the two sentences and one indexed lookup.
+
+The key is a SHA-256 digest of the serialize.dumps encodings of the knowledge
+base and the query. The encoding depends only on structure and symbol names,
+so separately built but equal sentences share an entry, while a change to
+either sentence gives a new key.
+
+The file holds at most max_entries results. Each hit records when it was
+used, and inserting past the limit removes the least recently used entries.
+Several processes can share one file: the database runs in WAL mode, so
+readers do not block the writer, every write is a single transaction, and a
+process waits up to a timeout for another's write to finish. A connection is
+opened per process, since SQLite connections must not cross a fork.
+
+Usage: python cache.py [--path FILE] [--characters N] [--puzzles P] [--clear]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+
+import serialize
+from logic import model_check
+
+# Default database file, kept next to this module
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "entailment.sqlite")
+
+# Default number of results kept
+MAX_ENTRIES = 100_000
+
+# Seconds to wait for another process's write
+TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entailment (
+    key BLOB PRIMARY KEY,
+    entailed INTEGER NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entailment_used ON entailment (used);
+"""
+
+
+def key(knowledge, query):
+    """Returns the cache key of an entailment question."""
+    digest = hashlib.sha256()
+    for sentence in (knowledge, query):
+        data = serialize.dumps(sentence)
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.digest()
+
+
+class EntailmentCache():
+    """
+Disk-backed, size-bounded cache in front of an entailment function.
+"""
+
+    def __init__(self, path=PATH, max_entries=MAX_ENTRIES, entails=model_check):
+        self.path = path
+        self.max_entries = max_entries
+        self.compute = entails
+        self.connection = None
+        self.pid = None
+
+        # Statistics of this process
+        self.hits = 0
+        self.misses = 0
+        self.lookup_time = 0      # Seconds spent hashing and looking up
+        self.compute_time = 0     # Seconds spent in the entailment function on misses
+
+    def connect(self):
+        """Returns this process's connection, opening it on first use."""
+        if self.connection is None or self.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=TIMEOUT, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self.connection, self.pid = connection, os.getpid()
+        return self.connection
+
+    def lookup(self, key):
+        """Returns the cached answer for a key, or None, and marks it used."""
+        connection = self.connect()
+        row = connection.execute("SELECT entailed FROM entailment WHERE key = ?",
+                                 (key,)).fetchone()
+        if row is None:
+            return None
+        connection.execute("UPDATE entailment SET used = ? WHERE key = ?",
+                           (time.time_ns(), key))
+        return bool(row[0])
+
+    def store(self, key, entailed):
+        """Saves an answer, evicting the least recently used entries past the limit."""
+        connection = self.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT OR REPLACE INTO entailment VALUES (?, ?, ?)",
+                               (key, int(entailed), time.time_ns()))
+            (count,) = connection.execute("SELECT COUNT(*) FROM entailment").fetchone()
+            if count > self.max_entries:
+                connection.execute(
+                    "DELETE FROM entailment WHERE key IN "
+                    "(SELECT key FROM entailment ORDER BY used LIMIT ?)",
+                    (count - self.max_entries,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def entails(self, knowledge, query):
+        """Returns True if knowledge entails query, from the cache when possible."""
+        start = time.perf_counter()
+        k = key(knowledge, query)
+        entailed = self.lookup(k)
+        self.lookup_time += time.perf_counter() - start
+        if entailed is not None:
+            self.hits += 1
+            return entailed
+
+        self.misses += 1
+        start = time.perf_counter()
+        entailed = self.compute(knowledge, query)
+        self.compute_time += time.perf_counter() - start
+        self.store(k, entailed)
+        return entailed
+
+    def __len__(self):
+        return self.connect().execute("SELECT COUNT(*) FROM entailment").fetchone()[0]
+
+    def clear(self):
+        """Removes every cached result."""
+        self.connect().execute("DELETE FROM entailment")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "lookup_ms": round(1000 * self.lookup_time / lookups, 4) if lookups else None,
+            "compute_ms": round(1000 * self.compute_time / self.misses, 4) if self.misses else None,
+        }
+
+
+def main():
+    from generator import generate
+
+    parser = argparse.ArgumentParser(description="Answer role queries through the entailment cache.")
+    parser.add_argument("--path", default=PATH, help="database file")
+    parser.add_argument("--max-entries", type=int, default=MAX_ENTRIES)
+    parser.add_argument("--characters", type=int, default=6)
+    parser.add_argument("--statements", type=float, default=1.5,
+                        help="statements per character")
+    parser.add_argument("--puzzles", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clear", action="store_true", help="empty the cache first")
+    args = parser.parse_args()
+
+    cache = EntailmentCache(args.path, args.max_entries)
+    if args.clear:
+        cache.clear()
+
+    start = time.perf_counter()
+    for offset in range(args.puzzles):
+        puzzle = generate(args.characters, round(args.statements * args.characters),
+                          seed=args.seed + offset)
+        for query in puzzle.queries():
+            cache.entails(puzzle.knowledge, query)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.puzzles} puzzles in {elapsed * 1000:.1f} ms")
+    print(cache.stats())
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
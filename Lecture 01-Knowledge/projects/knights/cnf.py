@@ -0,0 +1,141 @@
+"""
+Tseitin encoding of logic.py sentences into clauses.
+
+Every compound subsentence gets a fresh variable, defined by a few clauses to
+be equivalent to its connective applied to its operands' literals. The clauses
+grow linearly with the sentence, unlike distributing Or over And. Because each
+fresh variable is fully defined by its operands, every model of the original
+symbols extends to exactly one model of the clauses, so both satisfiability
+and model counts are preserved.
+
+Variables are positive integers and literals are nonzero integers, negative
+for negated variables, as in DIMACS.
+"""
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class Encoder():
+    """
+Turns sentences into literals, writing the defining clauses of every new
+subsentence through a callback. Subsentences are encoded once per object,
+so sentences sharing subterms share their variables.
+"""
+
+    def __init__(self, emit):
+        """
+Initialize an encoder that passes each new clause, a list of literals,
+to emit.
+        """
+        self.emit = emit
+        self.count = 0
+
+        # Symbol name -> variable
+        self.variables = {}
+
+        # id(sentence) -> (sentence, literal); the sentence is kept so its id stays unique
+        self.memo = {}
+
+        self.true = None
+
+    def new_variable(self):
+        """Returns a fresh variable."""
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable of a symbol name, creating it on first use."""
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.variables[name] = self.new_variable()
+        return variable
+
+    def constant(self, value):
+        """Returns a literal that is always true, or always false."""
+        if self.true is None:
+            self.true = self.new_variable()
+            self.emit([self.true])
+        return self.true if value else -self.true
+
+    def literal(self, sentence):
+        """
+Returns the literal equivalent to a sentence, encoding subsentences not seen
+before with an explicit stack rather than recursion.
+        """
+        stack = [(sentence, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in self.memo:
+                continue
+            if isinstance(node, Symbol):
+                self.memo[id(node)] = (node, self.variable(node.name))
+                continue
+            children = operands(node)
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children
+                             if id(child) not in self.memo)
+                continue
+            self.memo[id(node)] = (node, self.define(node, [self.memo[id(child)][1]
+                                                            for child in children]))
+        return self.memo[id(sentence)][1]
+
+    def define(self, sentence, literals):
+        """Returns a literal for a compound sentence given the literals of its operands."""
+        if isinstance(sentence, Not):
+            return -literals[0]
+        if isinstance(sentence, (And, Or)):
+            if not literals:
+                return self.constant(isinstance(sentence, And))
+            if len(literals) == 1:
+                return literals[0]
+            x = self.new_variable()
+            if isinstance(sentence, And):
+                for literal in literals:
+                    self.emit([-x, literal])
+                self.emit([x] + [-literal for literal in literals])
+            else:
+                for literal in literals:
+                    self.emit([x, -literal])
+                self.emit([-x] + literals)
+            return x
+        a, b = literals
+        x = self.new_variable()
+        if isinstance(sentence, Implication):
+            self.emit([x, a])
+            self.emit([x, -b])
+            self.emit([-x, -a, b])
+        else:
+            self.emit([-x, -a, b])
+            self.emit([-x, a, -b])
+            self.emit([x, a, b])
+            self.emit([x, -a, -b])
+        return x
+
+
+def operands(sentence):
+    """Returns the direct subsentences of a compound sentence."""
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+
+def encode(knowledge):
+    """
+Returns the clauses of a knowledge base and the encoder that made them.
+Each top-level conjunct is asserted as a unit clause.
+    """
+    clauses = []
+    encoder = Encoder(clauses.append)
+    conjuncts = knowledge.conjuncts if isinstance(knowledge, And) else [knowledge]
+    for conjunct in conjuncts:
+        clauses.append([encoder.literal(conjunct)])
+    return clauses, encoder
@@ -0,0 +1,108 @@
+"""
+Random knights-and-knaves puzzle generator.
+
+Builds puzzles like the ones in puzzle.py at any size. Every character is
+secretly given a role first; each statement is then a random nested sentence
+about the roles of random characters, negated if needed so that it is true
+exactly when its speaker is a knight. The hidden roles are therefore always
+a model of the knowledge base, so every puzzle is consistent.
+
+Usage: python generator.py [--characters N] [--statements M] [--depth D] [--seed S]
+"""
+
+import argparse
+import random
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check
+
+# Connectives used to build statements, with how many operands each takes
+CONNECTIVES = [(Not, 1), (And, 2), (Or, 2), (Implication, 2), (Biconditional, 2)]
+
+
+class Puzzle():
+    """
+A generated puzzle: its characters, role symbols, statements, knowledge base
+and the hidden roles that were used to build it.
+"""
+
+    def __init__(self, names, knights, knaves, statements, knowledge, solution):
+        self.names = names             # Character names
+        self.knights = knights         # Symbol "<name> is a Knight" per character
+        self.knaves = knaves           # Symbol "<name> is a Knave" per character
+        self.statements = statements   # (speaker index, sentence) pairs
+        self.knowledge = knowledge     # And of all rules and statements
+        self.solution = solution       # Model of the hidden roles
+
+    def queries(self):
+        """Returns every role symbol, the questions asked of a puzzle."""
+        return [symbol for pair in zip(self.knights, self.knaves) for symbol in pair]
+
+
+def random_statement(rng, knights, knaves, depth):
+    """Returns a random sentence about roles, nested up to depth connectives deep."""
+    if depth == 0 or rng.random() < 0.3:
+        character = rng.randrange(len(knights))
+        return rng.choice((knights, knaves))[character]
+    connective, arity = rng.choice(CONNECTIVES)
+    return connective(*(random_statement(rng, knights, knaves, depth - 1)
+                        for _ in range(arity)))
+
+
+def generate(characters, statements, depth=2, seed=None):
+    """
+Generates a consistent puzzle with the given number of characters and
+statements, each statement nested up to depth connectives deep.
+    """
+    rng = random.Random(seed)
+    names = [chr(ord("A") + k) if characters <= 26 else f"C{k}"
+             for k in range(characters)]
+    knights = [Symbol(f"{name} is a Knight") for name in names]
+    knaves = [Symbol(f"{name} is a Knave") for name in names]
+
+    # Hide a role for every character
+    solution = {}
+    for knight, knave in zip(knights, knaves):
+        is_knight = rng.random() < 0.5
+        solution[knight.name] = is_knight
+        solution[knave.name] = not is_knight
+
+    # Structural rules: each character is exactly one of knight or knave
+    knowledge = And()
+    for knight, knave in zip(knights, knaves):
+        knowledge.add(Or(knight, knave))
+        knowledge.add(Not(And(knight, knave)))
+
+    # Knights' statements hold and knaves' statements don't
+    said = []
+    for _ in range(statements):
+        speaker = rng.randrange(characters)
+        statement = random_statement(rng, knights, knaves, depth)
+        if statement.evaluate(solution) != solution[knights[speaker].name]:
+            statement = Not(statement)
+        said.append((speaker, statement))
+        knowledge.add(Implication(knights[speaker], statement))
+        knowledge.add(Implication(knaves[speaker], Not(statement)))
+
+    return Puzzle(names, knights, knaves, said, knowledge, solution)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a random knights-and-knaves puzzle.")
+    parser.add_argument("--characters", type=int, default=3)
+    parser.add_argument("--statements", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=2,
+                        help="maximum nesting of connectives in a statement")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    puzzle = generate(args.characters, args.statements, args.depth, args.seed)
+    for speaker, statement in puzzle.statements:
+        print(f"{puzzle.names[speaker]} says \"{statement.formula()}\"")
+    print("Entailed:")
+    for symbol in puzzle.queries():
+        if model_check(puzzle.knowledge, symbol):
+            print(f"    {symbol}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Forward-chaining entailment for Horn knowledge bases.
+
+A knowledge base is Horn when its clauses each have at most one positive
+literal. That covers facts, rules like (P ∧ Q) => R and constraints like
+¬(P ∧ Q). Such a knowledge base has a least model, and forward chaining finds
+it in time linear in the size of the clauses. Every rule keeps a count of
+premises not yet known to hold. Each atom taken from the agenda lowers the
+counts of the rules it appears in, and a rule whose count reaches zero adds
+its head to the agenda.
+
+compile_kb converts every conjunct to clauses and returns None if any clause
+has more than one positive literal. In that case, entails and
+entailed_atoms use the general backend instead.
+
+Usage: python horn.py [--atoms N] [--rules M] [--seed S]
+"""
+
+import argparse
+import functools
+import itertools
+import random
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check
+
+# Largest number of clauses one conjunct or query may expand to
+MAX_CLAUSES = 256
+
+
+class TooManyClauses(Exception):
+    """Raised when a sentence would expand to more than MAX_CLAUSES clauses."""
+
+
+def product(left, right):
+    """
+Returns the clauses of the disjunction of two clause lists: every pair of
+clauses merged, without tautologies.
+    """
+    if len(left) * len(right) > MAX_CLAUSES:
+        raise TooManyClauses()
+    clauses = []
+    for (pos1, neg1), (pos2, neg2) in itertools.product(left, right):
+        positive, negative = pos1 | pos2, neg1 | neg2
+        if not positive & negative:
+            clauses.append((positive, negative))
+    return clauses
+
+
+def clauses(sentence, positive=True):
+    """
+Returns the clauses of a sentence, or of its negation if positive is False.
+Each clause is a pair (positive atoms, negative atoms) of frozensets.
+Raises TooManyClauses if the sentence expands to too many clauses.
+    """
+    if isinstance(sentence, Symbol):
+        atom = frozenset([sentence.name])
+        return [(atom, frozenset())] if positive else [(frozenset(), atom)]
+    if isinstance(sentence, Not):
+        return clauses(sentence.operand, not positive)
+    if isinstance(sentence, (And, Or)):
+        children = sentence.conjuncts if isinstance(sentence, And) else sentence.disjuncts
+        if isinstance(sentence, And) == positive:
+            # A conjunction: the clauses of every part together
+            result = []
+            for child in children:
+                result.extend(clauses(child, positive))
+                if len(result) > MAX_CLAUSES:
+                    raise TooManyClauses()
+            return result
+        # A disjunction: distribute over the parts
+        result = [(frozenset(), frozenset())]
+        for child in children:
+            result = product(result, clauses(child, positive))
+        return result
+    if isinstance(sentence, Implication):
+        if positive:
+            return product(clauses(sentence.antecedent, False),
+                           clauses(sentence.consequent, True))
+        return clauses(sentence.antecedent, True) + clauses(sentence.consequent, False)
+    if isinstance(sentence, Biconditional):
+        left, right = sentence.left, sentence.right
+        if positive:
+            return (product(clauses(left, False), clauses(right, True))
+                    + product(clauses(right, False), clauses(left, True)))
+        return (product(clauses(left, True), clauses(right, True))
+                + product(clauses(left, False), clauses(right, False)))
+    raise TypeError(f"cannot convert {type(sentence).__name__}")
+
+
+def definite(sentence):
+    """
+Returns the clause of a fact P or a rule P => Q or (P ∧ Q) => R written with
+symbols only, or None for any other sentence.
+    """
+    if isinstance(sentence, Symbol):
+        return frozenset([sentence.name]), frozenset()
+    if not isinstance(sentence, Implication) or not isinstance(sentence.consequent, Symbol):
+        return None
+    body = sentence.antecedent
+    if isinstance(body, Symbol):
+        premises = frozenset([body.name])
+    elif isinstance(body, And) and all(isinstance(p, Symbol) for p in body.conjuncts):
+        premises = frozenset(p.name for p in body.conjuncts)
+    else:
+        return None
+    head = sentence.consequent.name
+    return (frozenset([head]), premises) if head not in premises else None
+
+
+def horn_clauses(knowledge):
+    """
+Returns the clauses of a knowledge base if they are all Horn, otherwise None.
+Each top-level conjunct is converted on its own, with facts and rules over
+symbols read off directly.
+    """
+    conjuncts = knowledge.conjuncts if isinstance(knowledge, And) else [knowledge]
+    result = []
+    for conjunct in conjuncts:
+        clause = definite(conjunct)
+        if clause is not None:
+            result.append(clause)
+            continue
+        try:
+            converted = clauses(conjunct)
+        except TooManyClauses:
+            return None
+        if any(len(positive) > 1 for positive, _ in converted):
+            return None
+        result.extend(converted)
+    return result
+
+
+def is_horn(knowledge):
+    """Returns True if a knowledge base converts to Horn clauses."""
+    return horn_clauses(knowledge) is not None
+
+
+class HornKB():
+    """
+A knowledge base of Horn clauses, indexed for forward chaining.
+"""
+
+    def __init__(self, clauses, symbols):
+        """
+Initialize from (positive atoms, negative atoms) clauses with at most one
+positive atom each, over the given symbol names.
+        """
+        self.symbols = set(symbols)
+
+        # Rule k: the premises that must all hold, and the head they prove
+        # (None for a constraint, whose premises must not all hold)
+        self.premises = []
+        self.heads = []
+
+        # Atom -> indices of the rules with that atom as a premise
+        self.watch = {}
+
+        for positive, negative in clauses:
+            rule = len(self.heads)
+            self.premises.append(len(negative))
+            self.heads.append(next(iter(positive)) if positive else None)
+            for atom in negative:
+                self.watch.setdefault(atom, []).append(rule)
+            self.symbols.update(positive, negative)
+
+        self.atoms, self.consistent = self.chain()
+
+    def chain(self, assumed=(), denied=()):
+        """
+Forward chains from the facts of the knowledge base and the assumed atoms.
+Returns the set of atoms proved and whether no constraint or denied atom
+was violated.
+        """
+        remaining = self.premises.copy()
+        agenda = [self.heads[rule] for rule, count in enumerate(remaining) if count == 0]
+        if None in agenda:
+            return set(), False
+        agenda.extend(assumed)
+        denied = set(denied)
+
+        proved = set()
+        while agenda:
+            atom = agenda.pop()
+            if atom in proved:
+                continue
+            if atom in denied:
+                return proved, False
+            proved.add(atom)
+            for rule in self.watch.get(atom, ()):
+                remaining[rule] -= 1
+                if remaining[rule] == 0:
+                    head = self.heads[rule]
+                    if head is None:
+                        return proved, False
+                    agenda.append(head)
+        return proved, True
+
+    def entailed_atoms(self):
+        """Returns every atom the knowledge base entails."""
+        return set(self.symbols) if not self.consistent else set(self.atoms)
+
+    def entails_clause(self, positive, negative):
+        """
+Returns True if the knowledge base entails the clause, that is, if assuming
+its negative atoms and denying its positive ones is inconsistent.
+        """
+        if not self.consistent or positive & self.atoms:
+            return True
+        if not negative:
+            return False
+        return not self.chain(negative, positive)[1]
+
+    def entails(self, query):
+        """
+Returns whether the knowledge base entails a query, or None if the query
+expands to too many clauses.
+        """
+        if isinstance(query, Symbol):
+            return not self.consistent or query.name in self.atoms
+        try:
+            query_clauses = clauses(query)
+        except TooManyClauses:
+            return None
+        return all(self.entails_clause(positive, negative)
+                   for positive, negative in query_clauses)
+
+
+def compile_kb(knowledge):
+    """Returns the HornKB of a knowledge base, or None if it is not Horn."""
+    converted = horn_clauses(knowledge)
+    if converted is None:
+        return None
+    return HornKB(converted, knowledge.symbols())
+
+
+@functools.lru_cache(maxsize=16)
+def compiled(knowledge):
+    """Returns the HornKB of a knowledge base, compiling it on first use."""
+    return compile_kb(knowledge)
+
+
+def entails(knowledge, query, fallback=model_check):
+    """
+Drop-in replacement for model_check that forward chains on Horn knowledge
+bases and calls fallback on anything else.
+    """
+    kb = compiled(knowledge)
+    if kb is not None:
+        result = kb.entails(query)
+        if result is not None:
+            return result
+    return fallback(knowledge, query)
+
+
+def entailed_atoms(knowledge, fallback=model_check):
+    """
+Returns the names of all symbols the knowledge base entails. A Horn
+knowledge base needs a single forward-chaining pass; any other is asked one
+symbol at a time with fallback.
+    """
+    kb = compiled(knowledge)
+    if kb is not None:
+        return kb.entailed_atoms()
+    return {name for name in knowledge.symbols()
+            if fallback(knowledge, Symbol(name))}
+
+
+def random_horn(atoms, rules, seed=None):
+    """
+Returns a random Horn knowledge base: a few facts and rules (P ∧ Q) => R
+over the given number of atoms.
+    """
+    rng = random.Random(seed)
+    symbols = [Symbol(f"P{k}") for k in range(atoms)]
+    knowledge = And(*rng.sample(symbols, max(1, atoms // 10)))
+    for _ in range(rules):
+        body = rng.sample(symbols, rng.randint(1, 3))
+        head = rng.choice(symbols)
+        knowledge.add(Implication(And(*body) if len(body) > 1 else body[0], head))
+    return knowledge
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forward chain a random Horn knowledge base.")
+    parser.add_argument("--atoms", type=int, default=10000)
+    parser.add_argument("--rules", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, default=12,
+                        help="also compare with model_check on a knowledge base this size")
+    args = parser.parse_args()
+
+    knowledge = random_horn(args.atoms, args.rules, args.seed)
+    start = time.perf_counter()
+    kb = compile_kb(knowledge)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    atoms, consistent = kb.chain()
+    chain_time = time.perf_counter() - start
+    print(f"{args.atoms} atoms, {args.rules} rules: converted to clauses in "
+          f"{compile_time * 1000:.1f} ms, {len(atoms)} atoms entailed by forward "
+          f"chaining in {chain_time * 1000:.1f} ms"
+          + ("" if consistent else ", inconsistent"))
+
+    if args.check:
+        small = random_horn(args.check, 2 * args.check, args.seed)
+        start = time.perf_counter()
+        chained = entailed_atoms(small)
+        chain_time = time.perf_counter() - start
+        start = time.perf_counter()
+        checked = {name for name in small.symbols() if model_check(small, Symbol(name))}
+        check_time = time.perf_counter() - start
+        print(f"{args.check} atoms: forward chaining {chain_time * 1000:.2f} ms, "
+              f"model_check {check_time * 1000:.2f} ms, "
+              f"{'same' if chained == checked else 'DIFFERENT'} answers")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import io
 import itertools
+import weakref
 
 class Sentence():
     """
@@ -6,18 +8,84 @@ Base class for all logical sentences in propositional logic.
 Provides common interface for evaluation, formula representation, and symbol extraction.
 """
 
+    # How tightly the connective binds in formulas; a child that binds no
+    # tighter than its parent connective is parenthesized
+    precedence = 5
+
     def evaluate(self, model):
         """Evaluates the logical sentence against a given model (truth assignment)."""
         raise Exception("nothing to evaluate")
 
     def formula(self):
-        """Returns string formula representing logical sentence in symbolic notation."""
-        return ""
+        """
+Returns string formula representing logical sentence in symbolic notation.
+The result is cached on the sentence. The cache is registered with every
+operand list and cached subsentence it was built from, and changing any of
+them forgets it (see Operands).
+"""
+        cached = self.__dict__.get("_formula")
+        if cached is not None:
+            return cached
+        buffer = io.StringIO()
+        sources = self.write_formula(buffer)
+        text = buffer.getvalue()
+        self._formula = text
+        for source in sources:
+            source.__dict__.setdefault("_dependents", weakref.WeakValueDictionary())[id(self)] = self
+        return text
+
+    def write_formula(self, stream):
+        """
+Writes the formula to a text stream in a single pass over the sentence,
+using an explicit stack so that deep sentences do not hit the recursion limit.
+Subsentences with a cached formula are written from the cache.
+Returns the operand lists and cached subsentences the output depends on.
+"""
+        sources = []
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                stream.write(item)
+                continue
+            cached = item.__dict__.get("_formula")
+            if cached is not None and item is not self:
+                stream.write(cached)
+                sources.append(item)
+                continue
+            if isinstance(item, (And, Or)):
+                sources.append(item.conjuncts if isinstance(item, And) else item.disjuncts)
+            stack.extend(reversed(item.pieces()))
+        return sources
+
+    def pieces(self):
+        """Returns the parts of the formula in order: strings and subsentences."""
+        return []
+
+    def binding(self):
+        """Returns the precedence of the formula as seen by an enclosing connective."""
+        return self.precedence
+
+    @classmethod
+    def group(cls, sentence, precedence):
+        """Returns the pieces placing a subsentence under a connective of the given precedence."""
+        if isinstance(sentence, Symbol):
+            return [Sentence.parenthesize(sentence.name)]
+        if sentence.binding() <= precedence:
+            return ["(", sentence, ")"]
+        return [sentence]
 
     def symbols(self):
         """Returns a set of all propositional symbols (variables) in the logical sentence."""
         return set()
 
+    def __getstate__(self):
+        """Leaves the formula cache out of pickles."""
+        state = self.__dict__.copy()
+        state.pop("_formula", None)
+        state.pop("_dependents", None)
+        return state
+
     @classmethod
     def validate(cls, sentence):
         """Validates that the input is a proper logical sentence."""
@@ -48,6 +116,44 @@ Provides common interface for evaluation, formula representation, and symbol ext
             return f"({s})"
 
 
+def forget(source):
+    """Drops the cached formulas that depend on a changed operand list or sentence."""
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        node.__dict__.pop("_formula", None)
+        dependents = node.__dict__.pop("_dependents", None)
+        if dependents is not None:
+            stack.extend(dependents.values())
+
+
+class Operands(list):
+    """
+Operand list of an And or Or. Every change to it forgets the cached formulas
+built from it, so conjuncts can be edited in place.
+"""
+
+    def __reduce__(self):
+        return (Operands, (list(self),))
+
+
+def changes(name):
+    """Returns a list method that forgets dependent formulas after running."""
+    method = getattr(list, name)
+
+    def changed(self, *args):
+        result = method(self, *args)
+        forget(self)
+        return result
+    changed.__name__ = name
+    return changed
+
+
+for name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+             "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(Operands, name, changes(name))
+
+
 class Symbol(Sentence):
     """Represents a propositional symbol (variable) in logical expressions."""
 
@@ -70,9 +176,9 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
-    def formula(self):
-        """Returns the symbol name as its formula representation."""
-        return self.name
+    def pieces(self):
+        """Returns the symbol name; as an operand it is parenthesized unless a single word."""
+        return [self.name]
 
     def symbols(self):
         """Returns a set containing only this symbol."""
@@ -82,6 +188,8 @@ class Symbol(Sentence):
 class Not(Sentence):
     """Represents logical negation (¬) operation."""
 
+    precedence = 4
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
@@ -99,9 +207,9 @@ class Not(Sentence):
         """Evaluates the negation: returns the opposite of the operand's truth value."""
         return not self.operand.evaluate(model)
 
-    def formula(self):
-        """Returns formula with negation symbol and proper parentheses."""
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+    def pieces(self):
+        """Returns negation symbol and operand, parenthesized unless it is a symbol or negation."""
+        return ["¬"] + Sentence.group(self.operand, self.precedence - 1)
 
     def symbols(self):
         """Returns symbols from the operand (negation doesn't introduce new symbols)."""
@@ -111,10 +219,19 @@ class Not(Sentence):
 class And(Sentence):
     """Represents logical conjunction (∧) operation with multiple conjuncts."""
 
+    precedence = 3
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = conjuncts
+
+    def __setattr__(self, name, value):
+        if name == "conjuncts":
+            if "conjuncts" in self.__dict__:
+                forget(self.conjuncts)
+            value = Operands(value)
+        super().__setattr__(name, value)
 
     def __eq__(self, other):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
@@ -139,12 +256,22 @@ class And(Sentence):
         """Evaluates conjunction: returns True only if ALL conjuncts are True."""
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
-    def formula(self):
-        """Returns formula with ∧ operator and proper parentheses."""
+    def pieces(self):
+        """Returns conjuncts joined by ∧, parenthesizing those that bind no tighter."""
         if len(self.conjuncts) == 1:
-            return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+            return [self.conjuncts[0]]
+        pieces = []
+        for conjunct in self.conjuncts:
+            if pieces:
+                pieces.append(" ∧ ")
+            pieces.extend(Sentence.group(conjunct, self.precedence))
+        return pieces
+
+    def binding(self):
+        """A single conjunct is written on its own, and no conjuncts as nothing."""
+        if len(self.conjuncts) == 1:
+            return self.conjuncts[0].binding()
+        return self.precedence if self.conjuncts else Sentence.precedence
 
     def symbols(self):
         """Returns union of all symbols from all conjuncts."""
@@ -154,10 +281,19 @@ class And(Sentence):
 class Or(Sentence):
     """Represents logical disjunction (∨) operation with multiple disjuncts."""
 
+    precedence = 2
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = disjuncts
+
+    def __setattr__(self, name, value):
+        if name == "disjuncts":
+            if "disjuncts" in self.__dict__:
+                forget(self.disjuncts)
+            value = Operands(value)
+        super().__setattr__(name, value)
 
     def __eq__(self, other):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
@@ -175,12 +311,22 @@ class Or(Sentence):
         """Evaluates disjunction: returns True if ANY disjunct is True."""
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
-    def formula(self):
-        """Returns formula with ∨ operator and proper parentheses."""
+    def pieces(self):
+        """Returns disjuncts joined by ∨, parenthesizing those that bind no tighter."""
+        if len(self.disjuncts) == 1:
+            return [self.disjuncts[0]]
+        pieces = []
+        for disjunct in self.disjuncts:
+            if pieces:
+                pieces.append(" ∨ ")
+            pieces.extend(Sentence.group(disjunct, self.precedence))
+        return pieces
+
+    def binding(self):
+        """A single disjunct is written on its own, and no disjuncts as nothing."""
         if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+            return self.disjuncts[0].binding()
+        return self.precedence if self.disjuncts else Sentence.precedence
 
     def symbols(self):
         """Returns union of all symbols from all disjuncts."""
@@ -190,6 +336,8 @@ class Or(Sentence):
 class Implication(Sentence):
     """Represents logical implication (=>) operation: antecedent => consequent."""
 
+    precedence = 1
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
@@ -212,11 +360,10 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
-    def formula(self):
+    def pieces(self):
         """Returns formula with => operator and proper parentheses."""
-        antecedent = Sentence.parenthesize(self.antecedent.formula())
-        consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+        return (Sentence.group(self.antecedent, self.precedence) + [" => "]
+                + Sentence.group(self.consequent, self.precedence))
 
     def symbols(self):
         """Returns union of symbols from both antecedent and consequent."""
@@ -226,6 +373,8 @@ class Implication(Sentence):
 class Biconditional(Sentence):
     """Represents logical biconditional (<=>) operation: left if and only if right."""
 
+    precedence = 0
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
@@ -250,11 +399,10 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
-    def formula(self):
+    def pieces(self):
         """Returns formula with <=> operator and proper parentheses."""
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
+        return (Sentence.group(self.left, self.precedence) + [" <=> "]
+                + Sentence.group(self.right, self.precedence))
 
     def symbols(self):
         """Returns union of symbols from both left and right sides."""
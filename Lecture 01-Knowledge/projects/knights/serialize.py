@@ -0,0 +1,396 @@
+"""
+Text and binary formats for logic.py knowledge bases.
+
+parse reads the notation that Sentence.formula() writes (¬, ∧, ∨, =>, <=>),
+so a knowledge base can be written by hand or round-tripped through text
+instead of being built from nested constructor calls.
+
+dumps and load store a sentence as a compact binary DAG. Structurally equal
+subterms are written once and shared when loaded, and the loader rebuilds
+the sentence with a loop over the nodes rather than recursion, so it handles
+arbitrarily deep sentences.
+
+Layout (all integers are unsigned LEB128 varints):
+
+    header      magic "LKB", version byte
+    counts      number of symbols S, number of compound nodes C, root index
+    symbols     S names, each a byte length followed by UTF-8 bytes
+    nodes       C nodes, children before parents: a tag byte, then
+                Not: child; And / Or: child count, children;
+                Implication / Biconditional: two children
+
+Nodes are numbered with the symbols first (0 to S - 1) and compound nodes
+after them. Every child is written as the distance back from the node that
+refers to it, which keeps most references to one byte.
+
+Usage:
+    python serialize.py parse FORMULA
+    python serialize.py bench [--characters N] [--statements M]
+"""
+
+import argparse
+import io
+import pickle
+import re
+import sys
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+MAGIC = b"LKB"
+VERSION = 1
+
+# Tag byte of each compound node type
+TAGS = {Not: 1, And: 2, Or: 3, Implication: 4, Biconditional: 5}
+TYPES = {tag: kind for kind, tag in TAGS.items()}
+
+# Binary operators of the text notation: precedence and right associativity
+OPERATORS = {
+    "∧": (3, False),
+    "∨": (2, False),
+    "=>": (1, True),
+    "<=>": (0, False),
+}
+NOT_PRECEDENCE = 4
+
+TOKENS = re.compile(r"(<=>|=>|¬|∧|∨|\(|\))")
+
+# Bytes read from the stream at a time when loading
+READ_SIZE = 1 << 16
+
+
+# -------------------------------
+# Text
+# -------------------------------
+
+def parse(text):
+    """
+Parses a formula in the notation of Sentence.formula() into a Sentence.
+Symbol names are whatever lies between operators and parentheses, with
+surrounding spaces removed. A chain like "a ∧ b ∧ c" becomes one And with
+three conjuncts; parenthesized groups are kept as separate nodes. The empty
+string parses as an empty And.
+Raises ValueError for malformed input.
+    """
+    tokens = [token.strip() for token in TOKENS.split(text)]
+    tokens = [token for token in tokens if token]
+    if not tokens:
+        return And()
+
+    symbols = {}
+    operands = []
+    operators = []
+    grouped = set()   # ids of operands that came from parentheses
+
+    def reduce():
+        operator = operators.pop()
+        if operator == "¬":
+            if not operands:
+                raise ValueError("¬ without an operand")
+            operands.append(Not(operands.pop()))
+            return
+        if len(operands) < 2:
+            raise ValueError(f"{operator} without two operands")
+        right = operands.pop()
+        left = operands.pop()
+        if operator in ("∧", "∨"):
+            kind = And if operator == "∧" else Or
+            if type(left) is kind and id(left) not in grouped:
+                # Continue a chain such as a ∧ b ∧ c
+                parts = left.conjuncts if kind is And else left.disjuncts
+                parts.append(right)
+                operands.append(left)
+            else:
+                operands.append(kind(left, right))
+        elif operator == "=>":
+            operands.append(Implication(left, right))
+        else:
+            operands.append(Biconditional(left, right))
+
+    expect_operand = True
+    for token in tokens:
+        if token == "(":
+            if not expect_operand:
+                raise ValueError("missing operator before (")
+            operators.append(token)
+        elif token == ")":
+            if expect_operand:
+                raise ValueError("missing operand before )")
+            while operators and operators[-1] != "(":
+                reduce()
+            if not operators:
+                raise ValueError("unbalanced )")
+            operators.pop()
+            grouped.add(id(operands[-1]))
+        elif token == "¬":
+            if not expect_operand:
+                raise ValueError("missing operator before ¬")
+            operators.append(token)
+        elif token in OPERATORS:
+            if expect_operand:
+                raise ValueError(f"missing operand before {token}")
+            precedence, right = OPERATORS[token]
+            while operators and operators[-1] != "(":
+                top = operators[-1]
+                top_precedence = NOT_PRECEDENCE if top == "¬" else OPERATORS[top][0]
+                if top_precedence > precedence or (top_precedence == precedence and not right):
+                    reduce()
+                else:
+                    break
+            operators.append(token)
+            expect_operand = True
+            continue
+        else:
+            if not expect_operand:
+                raise ValueError(f"missing operator before {token}")
+            symbol = symbols.get(token)
+            if symbol is None:
+                symbol = symbols[token] = Symbol(token)
+            operands.append(symbol)
+        expect_operand = token in ("(", "¬")
+
+    if expect_operand:
+        raise ValueError("formula ends without an operand")
+    while operators:
+        if operators[-1] == "(":
+            raise ValueError("unbalanced (")
+        reduce()
+    if len(operands) != 1:
+        raise ValueError("missing operator")
+    return operands[0]
+
+
+# -------------------------------
+# Binary
+# -------------------------------
+
+def children(sentence):
+    """Returns the direct subsentences of a compound sentence."""
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    raise TypeError(f"cannot serialize {type(sentence).__name__}")
+
+
+def write_varint(out, value):
+    """Appends an unsigned LEB128 integer to a bytearray."""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def dumps(sentence):
+    """Returns the binary DAG encoding of a sentence."""
+    symbols = {}     # name -> symbol index
+    refs = {}        # id(sentence) -> reference
+    shared = {}      # (tag, child references) -> compound index
+    nodes = []       # (tag, child references) per compound node
+
+    # References are symbol index s as -(s + 1), compound index c as c,
+    # until the number of symbols is known
+    stack = [(sentence, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in refs:
+            continue
+        if isinstance(node, Symbol):
+            refs[id(node)] = -(symbols.setdefault(node.name, len(symbols)) + 1)
+            continue
+        subsentences = children(node)
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(subsentences)
+                         if id(child) not in refs)
+            continue
+        key = (TAGS[type(node)], tuple(refs[id(child)] for child in subsentences))
+        index = shared.get(key)
+        if index is None:
+            index = shared[key] = len(nodes)
+            nodes.append(key)
+        refs[id(node)] = index
+
+    count = len(symbols)
+
+    def position(ref):
+        return -ref - 1 if ref < 0 else count + ref
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    write_varint(out, count)
+    write_varint(out, len(nodes))
+    write_varint(out, position(refs[id(sentence)]))
+    for name in symbols:
+        encoded = name.encode()
+        write_varint(out, len(encoded))
+        out += encoded
+    for index, (tag, refs_) in enumerate(nodes):
+        here = count + index
+        out.append(tag)
+        if tag in (2, 3):
+            write_varint(out, len(refs_))
+        for ref in refs_:
+            write_varint(out, here - position(ref))
+    return bytes(out)
+
+
+def dump(sentence, file):
+    """Writes the binary DAG encoding of a sentence to a binary file."""
+    file.write(dumps(sentence))
+
+
+class Reader():
+    """
+Reads bytes and varints from a binary stream in fixed-size blocks.
+"""
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = b""
+        self.position = 0
+
+    def fill(self):
+        """Reads the next block, keeping any unread bytes."""
+        block = self.file.read(READ_SIZE)
+        if not block:
+            raise ValueError("unexpected end of knowledge base")
+        self.buffer = self.buffer[self.position:] + block
+        self.position = 0
+
+    def byte(self):
+        if self.position >= len(self.buffer):
+            self.fill()
+        value = self.buffer[self.position]
+        self.position += 1
+        return value
+
+    def bytes(self, length):
+        while len(self.buffer) - self.position < length:
+            self.fill()
+        value = self.buffer[self.position:self.position + length]
+        self.position += length
+        return value
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+
+def load(file):
+    """
+Rebuilds a sentence from a binary file written by dump, reading it in blocks.
+Subterms that were shared when written are the same objects after loading.
+    """
+    reader = Reader(file)
+    if reader.bytes(len(MAGIC)) != MAGIC:
+        raise ValueError("not a logic knowledge base")
+    version = reader.byte()
+    if version != VERSION:
+        raise ValueError(f"unsupported knowledge base version {version}")
+
+    count = reader.varint()
+    compound = reader.varint()
+    root = reader.varint()
+
+    nodes = []
+    for _ in range(count):
+        nodes.append(Symbol(reader.bytes(reader.varint()).decode()))
+
+    varint = reader.varint
+    for index in range(count, count + compound):
+        tag = reader.byte()
+        kind = TYPES.get(tag)
+        if kind is None:
+            raise ValueError(f"unknown node tag {tag}")
+        if kind is Not:
+            nodes.append(Not(nodes[index - varint()]))
+        elif kind is And or kind is Or:
+            nodes.append(kind(*[nodes[index - varint()] for _ in range(varint())]))
+        else:
+            left = nodes[index - varint()]
+            nodes.append(kind(left, nodes[index - varint()]))
+    return nodes[root]
+
+
+def loads(data):
+    """Rebuilds a sentence from bytes made by dumps."""
+    return load(io.BytesIO(data))
+
+
+# -------------------------------
+# Benchmark
+# -------------------------------
+
+def timed(function, *args):
+    """Returns the result of a call and the seconds it took."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def bench(characters, statements, depth, seed):
+    """
+Compares size and load time of the binary format, pickle and formula text
+on a generated knowledge base.
+    """
+    from generator import generate
+
+    knowledge = generate(characters, statements, depth, seed).knowledge
+
+    data, dump_time = timed(dumps, knowledge)
+    loaded, load_time = timed(loads, data)
+    pickled, pickle_time = timed(pickle.dumps, knowledge, pickle.HIGHEST_PROTOCOL)
+    unpickled, unpickle_time = timed(pickle.loads, pickled)
+    text, format_time = timed(knowledge.formula)
+    parsed, parse_time = timed(parse, text)
+
+    assert loaded == knowledge and unpickled == knowledge and parsed == knowledge
+
+    rows = [
+        ("binary", len(data), dump_time, load_time),
+        ("pickle", len(pickled), pickle_time, unpickle_time),
+        ("text", len(text.encode()), format_time, parse_time),
+    ]
+    print(f"{characters} characters, {statements} statements")
+    print(f"{'format':8} {'bytes':>10} {'write ms':>10} {'read ms':>10}")
+    for name, size, write, read in rows:
+        print(f"{name:8} {size:>10} {write * 1000:>10.2f} {read * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse formulas or benchmark the binary format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parse_parser = commands.add_parser("parse", help="parse a formula and print its structure")
+    parse_parser.add_argument("formula")
+
+    bench_parser = commands.add_parser("bench", help="compare sizes and load times with pickle")
+    bench_parser.add_argument("--characters", type=int, default=200)
+    bench_parser.add_argument("--statements", type=int, default=300)
+    bench_parser.add_argument("--depth", type=int, default=3)
+    bench_parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "parse":
+        try:
+            print(repr(parse(args.formula)))
+        except ValueError as e:
+            sys.exit(f"Invalid formula: {e}")
+    else:
+        bench(args.characters, args.statements, args.depth, args.seed)
+
+
+if __name__ == "__main__":
+    main()
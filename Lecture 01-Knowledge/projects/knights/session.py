@@ -0,0 +1,409 @@
+"""
+Incremental entailment sessions for growing knowledge bases.
+
+A Session is bound to a logic.And knowledge base. It keeps a clause-learning
+SAT solver (CDCL) and the Tseitin encoding of every conjunct absorbed so far.
+Before each query it encodes only the conjuncts appended by And.add since
+the last query. A query is entailed when the knowledge base together with the
+query's negation is unsatisfiable. The negation is passed to the solver as
+an assumption, so nothing is removed afterwards. Learned clauses, variable
+activities and saved phases carry over between queries, so a stream of
+queries and updates does not restart from zero each time.
+
+Only appending to the top-level And is tracked. Conjuncts changed in place
+after they were absorbed are not seen again.
+
+Usage: python session.py [--characters N] [--statements M] [--seed S]
+"""
+
+import argparse
+import heapq
+import time
+
+from cnf import Encoder
+from logic import And, model_check
+
+# Conflicts before the first restart, and growth factor of the restart interval
+RESTART_FIRST = 100
+RESTART_GROWTH = 1.5
+
+# Activity decay of the branching heuristic
+DECAY = 0.95
+
+
+class Solver():
+    """
+CDCL SAT solver with two watched literals, first-UIP clause learning,
+activity-based branching with phase saving, restarts and solving under
+assumptions. Clauses can be added between calls to solve.
+"""
+
+    def __init__(self):
+        self.clauses = []
+        self.watches = {}          # literal -> clauses to visit when it becomes true
+        self.values = [None]       # variable -> True, False or None
+        self.levels = [0]          # variable -> decision level of its assignment
+        self.reasons = [None]      # variable -> clause that implied it
+        self.phases = [False]      # variable -> last value it had
+        self.activity = [0.0]
+        self.increment = 1.0
+        self.heap = []             # (-activity, variable), with stale entries
+        self.trail = []
+        self.limits = []           # trail length at the start of each decision level
+        self.head = 0              # next trail position to propagate
+        self.ok = True             # False once the clauses are unsatisfiable
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.learned = 0
+
+    def ensure(self, variable):
+        """Grows the per-variable arrays to hold a variable."""
+        while len(self.values) <= variable:
+            v = len(self.values)
+            self.values.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.phases.append(False)
+            self.activity.append(0.0)
+            heapq.heappush(self.heap, (0.0, v))
+
+    def value(self, literal):
+        """Returns the truth value of a literal, or None if unassigned."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def level(self):
+        return len(self.limits)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = self.level()
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level):
+        """Undoes every assignment above a decision level."""
+        if self.level() <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = None
+            self.reasons[variable] = None
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = start
+
+    def watch(self, clause):
+        """Stores a clause of two or more literals and watches its first two."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(-clause[0], []).append(index)
+        self.watches.setdefault(-clause[1], []).append(index)
+        return index
+
+    def add_clause(self, clause):
+        """
+Adds a clause, a list of literals. Literals false at the top level are
+dropped, and a clause already satisfied there is skipped.
+        """
+        if not self.ok:
+            return
+        self.backtrack(0)
+        literals = []
+        for literal in dict.fromkeys(clause):
+            self.ensure(abs(literal))
+            if -literal in literals:
+                return
+            value = self.value(literal)
+            if value is True:
+                return
+            if value is None:
+                literals.append(literal)
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.watch(literals)
+
+    def propagate(self):
+        """
+Assigns every literal forced by unit clauses.
+Returns the index of a conflicting clause, or None.
+        """
+        while self.head < len(self.trail):
+            literal = self.trail[self.head]
+            self.head += 1
+            false = -literal
+            watching = self.watches.get(literal, [])
+            self.watches[literal] = kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(-clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[position + 1:])
+                        return index
+                    self.assign(clause[0], index)
+                    self.propagations += 1
+        return None
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+        if self.values[variable] is None:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def analyze(self, conflict):
+        """
+Derives the first-UIP clause of a conflict.
+Returns the clause, asserting literal first, and the level to jump back to.
+        """
+        seen = set()
+        learned = [None]
+        pending = 0
+        position = len(self.trail) - 1
+        clause, start = self.clauses[conflict], 0
+        while True:
+            for literal in clause[start:]:
+                variable = abs(literal)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == self.level():
+                        pending += 1
+                    else:
+                        learned.append(literal)
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause, start = self.clauses[self.reasons[abs(literal)]], 1
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        top = max(range(1, len(learned)), key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[top] = learned[top], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def decide(self):
+        """Returns an unassigned variable of highest activity, or None."""
+        while self.heap:
+            _, variable = heapq.heappop(self.heap)
+            if self.values[variable] is None:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+Returns True if the clauses are satisfiable with every assumption literal
+true, leaving a model in self.model.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            self.ensure(abs(literal))
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        assumptions = list(assumptions)
+        restart = RESTART_FIRST
+        conflicts = 0
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    conflicts += 1
+                    if self.level() == 0:
+                        self.ok = False
+                        return False
+                    learned, level = self.analyze(conflict)
+                    self.backtrack(level)
+                    if len(learned) == 1:
+                        self.assign(learned[0], None)
+                    else:
+                        self.assign(learned[0], self.watch(learned))
+                        self.learned += 1
+                    self.increment /= DECAY
+                    continue
+
+                if conflicts >= restart:
+                    conflicts = 0
+                    restart *= RESTART_GROWTH
+                    self.backtrack(0)
+                    continue
+
+                if self.level() < len(assumptions):
+                    literal = assumptions[self.level()]
+                    value = self.value(literal)
+                    if value is False:
+                        return False
+                    self.limits.append(len(self.trail))
+                    if value is None:
+                        self.assign(literal, None)
+                    continue
+
+                variable = self.decide()
+                if variable is None:
+                    self.model = self.values.copy()
+                    return True
+                self.decisions += 1
+                self.limits.append(len(self.trail))
+                self.assign(variable if self.phases[variable] else -variable, None)
+        finally:
+            self.backtrack(0)
+
+    def stats(self):
+        return {
+            "variables": len(self.values) - 1,
+            "clauses": len(self.clauses),
+            "learned": self.learned,
+            "conflicts": self.conflicts,
+            "decisions": self.decisions,
+            "propagations": self.propagations,
+        }
+
+
+class Session():
+    """
+Entailment queries against a knowledge base that may grow with And.add.
+"""
+
+    def __init__(self, knowledge):
+        self.knowledge = knowledge
+        self.solver = Solver()
+        self.encoder = Encoder(self.solver.add_clause)
+        self.absorbed = 0
+        self.sync()
+
+    def sync(self):
+        """Encodes the conjuncts added to the knowledge base since the last call."""
+        if isinstance(self.knowledge, And):
+            conjuncts = self.knowledge.conjuncts
+        else:
+            conjuncts = [self.knowledge]
+        for conjunct in conjuncts[self.absorbed:]:
+            self.solver.add_clause([self.encoder.literal(conjunct)])
+        self.absorbed = len(conjuncts)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base and absorbs it."""
+        self.knowledge.add(sentence)
+        self.sync()
+
+    def satisfiable(self, assumptions=()):
+        """Returns True if the knowledge base and the assumed sentences have a model."""
+        self.sync()
+        literals = [self.encoder.literal(sentence) for sentence in assumptions]
+        return self.solver.solve(literals)
+
+    def entails(self, query, assumptions=()):
+        """
+Returns True if the knowledge base, with the assumed sentences, entails the
+query. The assumptions hold for this query only.
+        """
+        self.sync()
+        literals = [self.encoder.literal(sentence) for sentence in assumptions]
+        literals.append(-self.encoder.literal(query))
+        return not self.solver.solve(literals)
+
+    def model(self):
+        """
+Returns the truth values of the symbols in the last model found, or None if
+the last query had no model.
+        """
+        if self.solver.model is None:
+            return None
+        return {name: bool(self.solver.model[variable])
+                for name, variable in self.encoder.variables.items()}
+
+
+def replay(puzzle, entails):
+    """
+Builds a puzzle's knowledge base one statement at a time, asking every query
+after each addition with entails(knowledge, query).
+Returns the answers after each step and the total time.
+    """
+    knowledge = And(*puzzle.knowledge.conjuncts[:2 * len(puzzle.names)])
+    rest = puzzle.knowledge.conjuncts[2 * len(puzzle.names):]
+    answers = []
+    start = time.perf_counter()
+    for k in range(0, len(rest), 2):
+        knowledge.add(rest[k])
+        knowledge.add(rest[k + 1])
+        answers.append([entails(knowledge, query) for query in puzzle.queries()])
+    return answers, time.perf_counter() - start
+
+
+def main():
+    from generator import generate
+
+    parser = argparse.ArgumentParser(
+        description="Ask every role query after each statement is added to a puzzle."
+    )
+    parser.add_argument("--characters", type=int, default=40)
+    parser.add_argument("--statements", type=int, default=60)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, default=5,
+                        help="also compare with model_check on a puzzle with this many characters")
+    args = parser.parse_args()
+
+    puzzle = generate(args.characters, args.statements, args.depth, args.seed)
+    sessions = {}
+
+    def incremental(knowledge, query):
+        if id(knowledge) not in sessions:
+            sessions[id(knowledge)] = Session(knowledge)
+        return sessions[id(knowledge)].entails(query)
+
+    answers, elapsed = replay(puzzle, incremental)
+    session = next(iter(sessions.values()))
+    queries = len(answers) * len(puzzle.queries())
+    print(f"{args.characters} characters, {args.statements} statements: {queries} queries "
+          f"in {elapsed * 1000:.1f} ms ({1000 * elapsed / queries:.3f} ms per query), "
+          f"{sum(answers[-1])} entailed at the end")
+    print(session.solver.stats())
+
+    if args.check:
+        small = generate(args.check, round(1.5 * args.check), args.depth, args.seed)
+        sessions.clear()
+        fast, fast_time = replay(small, incremental)
+        slow, slow_time = replay(small, model_check)
+        print(f"{args.check} characters: session {fast_time * 1000:.1f} ms, "
+              f"model_check {slow_time * 1000:.1f} ms, "
+              f"{'same' if fast == slow else 'DIFFERENT'} answers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Weighted model counting for probabilistic queries over knowledge bases.
+
+Every symbol is given a prior probability of being true, independently of
+the others. The weight of a model is the product of p for the symbols true in
+it and 1 - p for the symbols false in it. P(query | knowledge) is the total
+weight of the models of knowledge ∧ query divided by that of knowledge.
+
+The knowledge base is Tseitin-encoded with cnf.Encoder, whose fresh variables
+are fully determined by the symbols, so they get weight one either way. The
+counter is exhaustive DPLL: it propagates unit clauses and splits the
+remaining clauses into components that share no variables, which are counted
+separately and multiplied. It branches on the most frequent variable and
+caches the weight of every component it has counted. Each symbol's weights
+sum to one, so a symbol that drops out of every clause contributes a factor
+of one and needs no bookkeeping.
+
+Usage: python wmc.py [--characters N] [--validate]
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import time
+from fractions import Fraction
+
+from cnf import Encoder
+from logic import And
+
+
+class Contradiction(Exception):
+    """Raised when conditioning empties a clause."""
+
+
+def condition(clauses, literals):
+    """
+Returns the clauses with a set of literals made true, raising Contradiction
+on an empty clause.
+    """
+    false = {-literal for literal in literals}
+    result = set()
+    for clause in clauses:
+        if not clause.isdisjoint(literals):
+            continue
+        if not clause.isdisjoint(false):
+            clause = clause - false
+            if not clause:
+                raise Contradiction()
+        result.add(clause)
+    return frozenset(result)
+
+
+def components(clauses):
+    """Splits clauses into groups that share no variables."""
+    parent = {}
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    for clause in clauses:
+        variables = [abs(literal) for literal in clause]
+        for v in variables:
+            parent.setdefault(v, v)
+        root = find(variables[0])
+        for v in variables[1:]:
+            other = find(v)
+            if other != root:
+                parent[other] = root
+
+    groups = {}
+    for clause in clauses:
+        groups.setdefault(find(abs(next(iter(clause)))), set()).add(clause)
+    return [frozenset(group) for group in groups.values()]
+
+
+class WeightedCounter():
+    """
+Weighted model counter bound to one knowledge base and one set of priors.
+The component cache is kept across queries.
+"""
+
+    def __init__(self, knowledge, priors=None, default=0.5):
+        """
+Encodes the knowledge base. priors maps symbol names to probabilities; symbols
+without one get default. Pass Fractions for exact results.
+        """
+        self.clauses = []
+        self.encoder = Encoder(self.clauses.append)
+        conjuncts = knowledge.conjuncts if isinstance(knowledge, And) else [knowledge]
+        for conjunct in conjuncts:
+            self.clauses.append([self.encoder.literal(conjunct)])
+        self.priors = priors or {}
+        self.default = default
+        self.probabilities = {}    # variable -> probability of true, for symbols
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def weight(self, literal):
+        """Returns the weight of a literal; Tseitin variables weigh one."""
+        p = self.probabilities.get(abs(literal))
+        if p is None:
+            return 1
+        return p if literal > 0 else 1 - p
+
+    def update_probabilities(self):
+        for name, variable in self.encoder.variables.items():
+            if variable not in self.probabilities:
+                self.probabilities[variable] = self.priors.get(name, self.default)
+
+    def count(self, clauses):
+        """Returns the weighted model count of a frozenset of clauses."""
+        if not clauses:
+            return 1
+        cached = self.cache.get(clauses)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        key = clauses
+        total = 1
+        try:
+            # Unit propagation, all current unit clauses at a time
+            while True:
+                units = {literal for clause in clauses if len(clause) == 1 for literal in clause}
+                if not units:
+                    break
+                if any(-literal in units for literal in units):
+                    raise Contradiction()
+                for literal in units:
+                    total *= self.weight(literal)
+                clauses = condition(clauses, units)
+
+            parts = components(clauses)
+            if len(parts) > 1:
+                for part in parts:
+                    total *= self.count(part)
+                    if not total:
+                        break
+            elif clauses:
+                # Branch on the variable in the most clauses
+                occurrences = {}
+                for clause in clauses:
+                    for literal in clause:
+                        occurrences[abs(literal)] = occurrences.get(abs(literal), 0) + 1
+                variable = max(occurrences, key=occurrences.get)
+                branches = 0
+                for literal in (variable, -variable):
+                    try:
+                        branches += self.weight(literal) * self.count(condition(clauses, {literal}))
+                    except Contradiction:
+                        pass
+                total *= branches
+        except Contradiction:
+            total = 0
+
+        self.cache[key] = total
+        return total
+
+    def total(self, sentences=()):
+        """Returns the weight of the models of the knowledge base and the given sentences."""
+        extra = [[self.encoder.literal(sentence)] for sentence in sentences]
+        self.update_probabilities()
+        return self.count(frozenset(frozenset(clause) for clause in self.clauses + extra))
+
+    def probability(self, query, evidence=()):
+        """
+Returns P(query | knowledge ∧ evidence), where evidence is a list of
+sentences. Raises ZeroDivisionError if the condition has probability zero.
+        """
+        # Encode the query first so both counts see the same definitions
+        self.encoder.literal(query)
+        base = self.total(evidence)
+        return self.total(list(evidence) + [query]) / base
+
+    def stats(self):
+        return {
+            "variables": self.encoder.count,
+            "clauses": len(self.clauses),
+            "cache_entries": len(self.cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+def probability(knowledge, query, priors=None, default=0.5):
+    """Returns P(query | knowledge) with independent symbol priors."""
+    return WeightedCounter(knowledge, priors, default).probability(query)
+
+
+def brute_force(knowledge, query, priors=None, default=0.5):
+    """Returns P(query | knowledge) by enumerating every model."""
+    priors = priors or {}
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    both = base = 0
+    for values in itertools.product((True, False), repeat=len(names)):
+        model = dict(zip(names, values))
+        if not knowledge.evaluate(model):
+            continue
+        weight = 1
+        for name, value in model.items():
+            p = priors.get(name, default)
+            weight *= p if value else 1 - p
+        base += weight
+        if query.evaluate(model):
+            both += weight
+    return both / base
+
+
+def validate(trials, seed):
+    """
+Compares exact weighted counts with brute force on small generated puzzles
+with random rational priors. Returns the number of mismatches.
+    """
+    from generator import generate
+
+    rng = random.Random(seed)
+    mismatches = 0
+    for trial in range(trials):
+        puzzle = generate(rng.randint(2, 4), rng.randint(2, 5), 2, rng.randrange(10 ** 6))
+        priors = {symbol.name: Fraction(rng.randint(1, 9), 10) for symbol in puzzle.queries()}
+        counter = WeightedCounter(puzzle.knowledge, priors)
+        for query in puzzle.queries():
+            if counter.probability(query) != brute_force(puzzle.knowledge, query, priors):
+                mismatches += 1
+    return mismatches
+
+
+def main():
+    from generator import generate
+
+    parser = argparse.ArgumentParser(description="Compute role probabilities of a puzzle.")
+    parser.add_argument("--characters", type=int, default=30)
+    parser.add_argument("--statements", type=float, default=0.5,
+                        help="statements per character")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--validate", type=int, default=0, metavar="TRIALS",
+                        help="check this many small puzzles against brute force first")
+    args = parser.parse_args()
+
+    if args.validate:
+        mismatches = validate(args.validate, args.seed)
+        print(f"{args.validate} puzzles checked against brute force, {mismatches} mismatches")
+        if mismatches:
+            sys.exit(1)
+
+    puzzle = generate(args.characters, round(args.statements * args.characters),
+                      seed=args.seed)
+    rng = random.Random(args.seed)
+    priors = {}
+    for knight, knave in zip(puzzle.knights, puzzle.knaves):
+        priors[knight.name] = rng.uniform(0.2, 0.8)
+        priors[knave.name] = 1 - priors[knight.name]
+
+    counter = WeightedCounter(puzzle.knowledge, priors)
+    start = time.perf_counter()
+    probabilities = {query.name: counter.probability(query) for query in puzzle.knights}
+    elapsed = time.perf_counter() - start
+
+    print(f"{2 * args.characters} symbols: {len(probabilities)} probabilities "
+          f"in {elapsed * 1000:.1f} ms; enumeration would visit 2^{2 * args.characters} models")
+    for name, p in list(probabilities.items())[:10]:
+        print(f"    P({name}) = {p:.4f}")
+    print(counter.stats())
+
+
+if __name__ == "__main__":
+    main()
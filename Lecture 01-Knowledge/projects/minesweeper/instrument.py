@@ -0,0 +1,123 @@
+"""
+Instrumentation for MinesweeperAI inference.
+
+An Observer passed to MinesweeperAI(observer=...) receives an event for every
+step of inference, counts them, sums their numbers, calls any subscribed
+callbacks and can write them to a stream as JSON lines for offline analysis.
+Without an observer the AI skips all of this.
+
+Events and their fields:
+
+    sentence    cell, count, cells (size of the new sentence), knowledge
+    mark        cell, mine, rule ("count" or "solver"), sentence (for "count")
+    propagate   iterations, mines, safes, knowledge, seconds
+    inference   rule ("subset"), subset, superset, result
+    subset      pairs, inferences, knowledge, seconds
+    solve       knowledge, seconds
+
+Sentences are written as [cells, count]. propagate is the loop that marks the
+cells sentences prove; subset and solve are the two ways of drawing new
+conclusions, depending on use_solver.
+
+The command line plays seeded games with instrumentation off, with counters
+only and with an event stream, and reports the time of each.
+
+Usage: python instrument.py [--games N] [--difficulty LEVEL] [--events FILE]
+"""
+
+import argparse
+import collections
+import io
+import json
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+from simulate import DIFFICULTIES
+
+
+class Observer():
+    """
+Collects inference events from a MinesweeperAI: counts per kind, sums of
+numeric fields, callbacks and an optional JSON-lines stream.
+"""
+
+    def __init__(self, stream=None, callbacks=()):
+        self.counts = collections.Counter()   # Events by kind
+        self.totals = collections.Counter()   # Sums of numeric fields, as "kind.field"
+        self.callbacks = list(callbacks)      # Functions called with (kind, fields)
+        self.stream = stream                  # Text file receiving JSON lines, or None
+
+    def subscribe(self, callback):
+        """Calls callback(kind, fields) for every later event."""
+        self.callbacks.append(callback)
+
+    def event(self, kind, **fields):
+        """Records one event."""
+        self.counts[kind] += 1
+        for name, value in fields.items():
+            if type(value) in (int, float):
+                self.totals[f"{kind}.{name}"] += value
+        for callback in self.callbacks:
+            callback(kind, fields)
+        if self.stream is not None:
+            self.stream.write(json.dumps({"event": kind, **fields}) + "\n")
+
+    def summary(self):
+        """Returns the event counts and totals as a dictionary."""
+        return {
+            "events": dict(self.counts),
+            "totals": {name: round(value, 6) for name, value in sorted(self.totals.items())},
+        }
+
+
+def play(height, width, mines, seed, observer=None):
+    """Plays one seeded game and returns the seconds spent in add_knowledge_batch."""
+    game = Minesweeper(height, width, mines, seed=seed)
+    ai = MinesweeperAI(height, width, seed=seed, observer=observer)
+    elapsed = 0
+    while True:
+        move = ai.make_safe_move() or ai.make_random_move()
+        if move is None or game.is_mine(move):
+            return elapsed
+        opened = game.reveal(move)
+        start = time.perf_counter()
+        ai.add_knowledge_batch(opened)
+        elapsed += time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of inference instrumentation.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, default="intermediate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per mode; the best one counts")
+    parser.add_argument("--events", help="also write the stream of the last run to this file")
+    args = parser.parse_args()
+
+    height, width, mines = DIFFICULTIES[args.difficulty]
+    modes = {
+        "off": lambda: None,
+        "counters": Observer,
+        "stream": lambda: Observer(io.StringIO()),
+    }
+    best = {}
+    for mode, make_observer in modes.items():
+        for _ in range(args.repeat):
+            observer = make_observer()
+            seconds = sum(play(height, width, mines, args.seed + game, observer)
+                          for game in range(args.games))
+            best[mode] = min(best.get(mode, seconds), seconds)
+
+    for mode, seconds in best.items():
+        print(f"{mode:9} {seconds * 1000:9.1f} ms in add_knowledge_batch, "
+              f"{(seconds / best['off'] - 1) * 100:+.1f}% over off")
+    print(json.dumps(observer.summary(), indent=2))
+
+    if args.events:
+        with open(args.events, "w") as f:
+            f.write(observer.stream.getvalue())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 import itertools
 import random
 import copy
+import time
+from collections import deque
+
+import numpy as np
+
+import solver
 
 
 class Minesweeper():
@@ -9,72 +15,118 @@ Main Minesweeper game class that represents the game board and state.
 Handles mine placement, game state, and basic game operations.
 """
 
-    def __init__(self, height=8, width=8, mines=8):
-        """Initialize the Minesweeper game with given dimensions and mine count."""
+    def __init__(self, height=8, width=8, mines=8, seed=None):
+        """
+Initialize the Minesweeper game with given dimensions and mine count.
+The same seed always produces the same board; without one a seed is drawn
+at random and kept in self.seed so the board can be recreated later.
+        """
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()  # Stores coordinates of all mines
+        self.seed = seed if seed is not None else random.getrandbits(64)
 
-        # Initialize an empty field with no mines (False = no mine)
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Choose distinct mine positions by sampling flat indices without replacement
+        rng = np.random.default_rng(self.seed)
+        positions = rng.choice(height * width, size=mines, replace=False)
+
+        # Boolean field of the whole board (True = mine)
+        self.board = np.zeros((height, width), dtype=bool)
+        self.board.flat[positions] = True
+
+        # Coordinates of all mines are built on first use (see `mines`)
+        self._mines = None
 
-        # Add mines randomly to the board
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True  # Mark cell as containing a mine
+        # Precompute the number of neighboring mines for every cell at once
+        # by summing the eight shifted copies of a zero-padded board
+        padded = np.pad(self.board, 1).astype(np.uint8)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di in range(3):
+            for dj in range(3):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
 
         # Track which mines have been correctly identified by the player
         self.mines_found = set()
 
+        # Track which cells have been revealed
+        self.revealed = set()
+
+    @property
+    def mines(self):
+        """Set of coordinates of all mines, built from the board when first needed."""
+        if self._mines is None:
+            rows, cols = np.nonzero(self.board)
+            self._mines = set(zip(rows.tolist(), cols.tolist()))
+        return self._mines
+
     def print(self):
         """Prints a text-based representation of the board showing mine locations."""
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i, j]:
                     print("|X", end="")  # X represents a mine
                 else:
                     print("| ", end="")  # Space represents safe cell
             print("|")
         print("--" * self.width + "-")
 
+    def validate(self, cell):
+        """
+Raises ValueError unless cell is a (row, column) pair on the board.
+NumPy would otherwise wrap negative indices around to the far edge.
+        """
+        i, j = cell
+        if not (0 <= i < self.height and 0 <= j < self.width):
+            raise ValueError(f"cell {cell} is not on the board")
+
     def is_mine(self, cell):
         """Check if a given cell contains a mine."""
+        self.validate(cell)
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
 Returns the number of mines that are within one row and column of a given cell,
 not including the cell itself. This is the number shown when a cell is revealed.
         """
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column (3x3 area centered on cell)
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell is in bounds and contains a mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        self.validate(cell)
+        i, j = cell
+        return int(self.counts[i, j])
 
-        return count
+    def reveal(self, cell):
+        """
+Reveals a safe cell and, if it has no neighboring mines, flood-fills outward
+through every connected zero-count cell and its border.
+Returns a list of (cell, count) pairs for all newly revealed cells.
+The caller is expected to check is_mine first. Raises ValueError for a cell
+that is not on the board.
+        """
+        self.validate(cell)
+        if cell in self.revealed:
+            return []
+
+        opened = []
+        self.revealed.add(cell)
+        frontier = deque([cell])
+        while frontier:
+            i, j = frontier.popleft()
+            count = self.counts.item(i, j)
+            opened.append(((i, j), count))
+            if count:
+                continue
+
+            # Neighbors of a zero-count cell can never be mines
+            for ni in range(max(0, i - 1), min(self.height, i + 2)):
+                for nj in range(max(0, j - 1), min(self.width, j + 2)):
+                    if (ni, nj) not in self.revealed:
+                        self.revealed.add((ni, nj))
+                        frontier.append((ni, nj))
+
+        return opened
 
     def won(self):
         """Check if all mines have been correctly identified (game won)."""
@@ -141,19 +193,83 @@ Removes the cell from consideration (mine count remains unchanged).
         return False
 
 
+class CellSet():
+    """
+Set of cells that also keeps its members in a list.
+Supports constant-time add, remove, membership and uniform random choice.
+"""
+
+    def __init__(self, cells=()):
+        """Initialize the set with the given cells."""
+        self.cells = []   # Members in arbitrary order
+        self.index = {}   # Maps each member to its position in the list
+        for cell in cells:
+            self.add(cell)
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def add(self, cell):
+        """Adds a cell if it is not already a member."""
+        if cell not in self.index:
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        """
+Removes a cell if it is a member.
+The last member is moved into the freed slot so the list never has gaps.
+        """
+        position = self.index.pop(cell, None)
+        if position is None:
+            return
+        last = self.cells.pop()
+        if position < len(self.cells):
+            self.cells[position] = last
+            self.index[last] = position
+
+    def copy(self):
+        """Returns an independent copy of the set."""
+        other = CellSet()
+        other.cells = self.cells.copy()
+        other.index = self.index.copy()
+        return other
+
+    def choice(self, rng=random):
+        """Returns a uniformly random member, or None if the set is empty."""
+        return rng.choice(self.cells) if self.cells else None
+
+
 class MinesweeperAI():
     """
 AI player for Minesweeper that uses logical inference to play the game.
 Maintains knowledge about safe cells, mines, and makes intelligent moves.
 """
 
-    def __init__(self, height=8, width=8):
-        """Initialize the AI with game dimensions and empty knowledge base."""
+    def __init__(self, height=8, width=8, use_solver=False, seed=None, observer=None):
+        """
+Initialize the AI with game dimensions and empty knowledge base.
+If use_solver is True, the linear-algebra solver in solver.py replaces
+pairwise subset elimination when drawing inferences.
+The seed makes the AI's random moves reproducible.
+If an observer is given (see instrument.py), every inference stage reports
+what it did to observer.event.
+        """
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Random number generator for random moves
+        self.seed = seed
+        self.rng = random.Random(seed)
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -164,13 +280,59 @@ Maintains knowledge about safe cells, mines, and makes intelligent moves.
         # List of sentences about the game known to be true (knowledge base)
         self.knowledge = []
 
+        # Safe cells waiting to be played, in the order they were found
+        self.safe_queue = deque()
+
+        # Cells that have not been played and are not known mines, built only
+        # once most of the board is known (see make_random_move)
+        self.unknown = None
+
+        # Inference settings, and cells in sentences added since the last inference
+        self.use_solver = use_solver
+        self.touched = set()
+
+        # True while this AI shares its state with a fork (see fork)
+        self.shared = False
+
+        # Receives inference events, or None to skip all instrumentation
+        self.observer = observer
+
+    def fork(self):
+        """
+Returns a copy of the AI for what-if searches without copying any state yet.
+The fork and the original share their sets, sentences and queues until one
+of them changes something; only then does that one copy the state it owns.
+        """
+        other = copy.copy(self)
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        self.shared = other.shared = True
+        return other
+
+    def own(self):
+        """Copies shared state before this AI modifies it (see fork)."""
+        if not self.shared:
+            return
+        self.shared = False
+        self.moves_made = self.moves_made.copy()
+        self.mines = self.mines.copy()
+        self.safes = self.safes.copy()
+        self.knowledge = [Sentence(s.cells, s.count) for s in self.knowledge]
+        self.safe_queue = self.safe_queue.copy()
+        if self.unknown is not None:
+            self.unknown = self.unknown.copy()
+        self.touched = self.touched.copy()
+
     def mark_mine(self, cell):
         """
 Mark a cell as a mine and update all sentences in knowledge base.
 Propagates this information through all known constraints.
         """
         if cell not in self.mines:
+            self.own()
             self.mines.add(cell)
+            if self.unknown is not None:
+                self.unknown.discard(cell)
             for sentence in self.knowledge:
                 sentence.mark_mine(cell)
 
@@ -180,7 +342,10 @@ Mark a cell as safe and update all sentences in knowledge base.
 Propagates this information through all known constraints.
         """
         if cell not in self.safes:
+            self.own()
             self.safes.add(cell)
+            if cell not in self.moves_made:
+                self.safe_queue.append(cell)
             for sentence in self.knowledge:
                 sentence.mark_safe(cell)
 
@@ -193,9 +358,29 @@ Steps:
 2. Create new sentence from revealed cell's neighbors
 3. Update knowledge base with new inferences
 4. Make additional inferences through subset elimination
+        """
+        self.add_knowledge_batch([(cell, count)])
+
+    def add_knowledge_batch(self, observations):
+        """
+Called when several cells are revealed at once, e.g. by a zero cascade.
+Takes an iterable of (cell, count) pairs, records a sentence for each one
+(steps 1 and 2 of add_knowledge), then runs inference a single time.
+        """
+        for cell, count in observations:
+            self.add_sentence(cell, count)
+        self.infer()
+
+    def add_sentence(self, cell, count):
+        """
+Records a revealed cell as a move and adds the sentence formed by its
+unknown neighbors to the knowledge base, without running inference.
         """
         # 1) Mark that move has been made and cell is safe
+        self.own()
         self.moves_made.add(cell)
+        if self.unknown is not None:
+            self.unknown.discard(cell)
         self.mark_safe(cell)
 
         # 2) Get all neighboring cells (3x3 area excluding center)
@@ -223,11 +408,30 @@ Steps:
         new_sentence = Sentence(new_cells, count_after_ignoring_mines)
         if len(new_sentence.cells) > 0:
             self.knowledge.append(new_sentence)
+            self.touched.update(new_sentence.cells)
+
+        if self.observer is not None:
+            self.observer.event("sentence", cell=cell, count=count,
+                                cells=len(new_sentence.cells), knowledge=len(self.knowledge))
+
+    def infer(self):
+        """
+Draws conclusions from the knowledge base: marks every cell that a sentence
+proves to be a mine or safe, then adds sentences found by subset elimination.
+        """
+        observer = self.observer
+        if observer is not None:
+            start = time.perf_counter()
+            known = len(self.mines), len(self.safes)
+            iterations = 0
 
         # 3) Continuously update knowledge until no more conclusions can be drawn
+        self.own()
         changes_made = True
         while changes_made:
             changes_made = False
+            if observer is not None:
+                iterations += 1
 
             # Create a copy to avoid modifying while iterating
             for sentence in copy.deepcopy(self.knowledge):
@@ -237,16 +441,38 @@ Steps:
 
                 if new_mines:
                     for mine in new_mines:
+                        if observer is not None and mine not in self.mines:
+                            observer.event("mark", cell=mine, mine=True, rule="count",
+                                           sentence=[sorted(sentence.cells), sentence.count])
                         self.mark_mine(mine)
                         changes_made = True
 
                 if new_safes:
                     for safe in new_safes:
+                        if observer is not None and safe not in self.safes:
+                            observer.event("mark", cell=safe, mine=False, rule="count",
+                                           sentence=[sorted(sentence.cells), sentence.count])
                         self.mark_safe(safe)
                         changes_made = True
 
+        if observer is not None:
+            now = time.perf_counter()
+            observer.event("propagate", iterations=iterations,
+                           mines=len(self.mines) - known[0], safes=len(self.safes) - known[1],
+                           knowledge=len(self.knowledge), seconds=now - start)
+            start = now
+
+        # 4) Solve the changed part of the frontier as a linear system instead
+        if self.use_solver:
+            self.solve_frontier()
+            if observer is not None:
+                observer.event("solve", knowledge=len(self.knowledge),
+                               seconds=time.perf_counter() - start)
+            return
+
         # 4) Make additional inferences using subset elimination
         # If one sentence is a subset of another, we can infer a new sentence
+        self.touched.clear()
         new_inferences = []
         for i in range(len(self.knowledge)):
             for j in range(i + 1, len(self.knowledge)):
@@ -261,6 +487,8 @@ Steps:
                     # Add new inference if it's meaningful
                     if len(new_sentence.cells) > 0 and new_sentence not in self.knowledge:
                         new_inferences.append(new_sentence)
+                        if observer is not None:
+                            self.report_inference(sentence_1, sentence_2, new_sentence)
 
                 elif sentence_2.cells.issubset(sentence_1.cells):
                     new_cells = sentence_1.cells - sentence_2.cells
@@ -269,18 +497,58 @@ Steps:
 
                     if len(new_sentence.cells) > 0 and new_sentence not in self.knowledge:
                         new_inferences.append(new_sentence)
+                        if observer is not None:
+                            self.report_inference(sentence_2, sentence_1, new_sentence)
 
         # Add all new inferences to knowledge base
         self.knowledge.extend(new_inferences)
 
+        if observer is not None:
+            size = len(self.knowledge) - len(new_inferences)
+            observer.event("subset", pairs=size * (size - 1) // 2,
+                           inferences=len(new_inferences), knowledge=len(self.knowledge),
+                           seconds=time.perf_counter() - start)
+
+    def report_inference(self, subset, superset, sentence):
+        """Reports a sentence found by subtracting one sentence from another."""
+        self.observer.event("inference", rule="subset",
+                            subset=[sorted(subset.cells), subset.count],
+                            superset=[sorted(superset.cells), superset.count],
+                            result=[sorted(sentence.cells), sentence.count])
+
+    def solve_frontier(self):
+        """
+Runs the linear-algebra solver over the components of the knowledge base
+touched since the last inference, marking every mine and safe cell it proves
+and repeating until it finds nothing new. Empty sentences are dropped.
+        """
+        touched, self.touched = self.touched, set()
+        while touched:
+            self.knowledge = [s for s in self.knowledge if s.cells]
+            mines, safes = solver.solve(self.knowledge, touched)
+            mines -= self.mines
+            safes -= self.safes
+            if self.observer is not None:
+                for cell in mines | safes:
+                    self.observer.event("mark", cell=cell, mine=cell in mines, rule="solver")
+            for mine in mines:
+                self.mark_mine(mine)
+            for safe in safes:
+                self.mark_safe(safe)
+            touched = (touched - mines - safes) if mines or safes else set()
+
     def make_safe_move(self):
         """
 Returns a safe cell to choose (known to be safe and not yet played).
 This is the AI's preferred move when safe options are available.
         """
-        for safe_cell in self.safes:
+        # Drop queued cells that have been played since they were found safe
+        while self.safe_queue:
+            safe_cell = self.safe_queue[0]
             if safe_cell not in self.moves_made and safe_cell not in self.mines:
                 return safe_cell
+            self.own()
+            self.safe_queue.popleft()
         return None
 
     def make_random_move(self):
@@ -288,18 +556,20 @@ This is the AI's preferred move when safe options are available.
 Returns a random move when no safe moves are known.
 Chooses from cells that haven't been played and aren't known mines.
         """
-        # Check if game is complete (all non-mine cells played)
-        total_cells = self.height * self.width
-        if len(self.moves_made) + len(self.mines) >= total_cells:
-            return None
-
-        # Generate all possible cells and filter out invalid ones
-        possible_moves = []
-        for i in range(self.height):
-            for j in range(self.width):
-                cell = (i, j)
-                if cell not in self.moves_made and cell not in self.mines:
-                    possible_moves.append(cell)
-
-        # Return random choice from valid moves (or None if none exist)
-        return random.choice(possible_moves) if possible_moves else None
\ No newline at end of file
+        # While at least half the board is unknown, a uniformly drawn cell is
+        # unknown with probability at least 1/2, so sampling needs few tries
+        if self.unknown is None:
+            known = len(self.moves_made) + len(self.mines)
+            if 2 * known < self.height * self.width:
+                while True:
+                    cell = (self.rng.randrange(self.height), self.rng.randrange(self.width))
+                    if cell not in self.moves_made and cell not in self.mines:
+                        return cell
+
+            # Past that, keep the unknown cells in a set from now on
+            self.own()
+            self.unknown = CellSet(
+                (i, j) for i in range(self.height) for j in range(self.width)
+                if (i, j) not in self.moves_made and (i, j) not in self.mines
+            )
+        return self.unknown.choice(self.rng)
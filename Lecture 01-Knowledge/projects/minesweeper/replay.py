@@ -0,0 +1,185 @@
+"""
+Compact replay logs for Minesweeper games.
+
+A replay is a text file of JSON lines. The first line is a header holding the
+board size, mine count, board seed and AI settings. Every following line is
+one move as a flat list of integers:
+
+    [i, j, i1, j1, count1, i2, j2, count2, ...]   move (i, j) opened these cells
+    [i, j, -1]                                     move (i, j) hit a mine
+
+Replaying feeds the recorded observations straight into add_knowledge_batch,
+so a slow or losing game can be rerun at full speed as a benchmark, with the
+time of every step measured.
+
+Usage:
+    python replay.py record OUTPUT [--seed N] [--height H --width W --mines M]
+    python replay.py run REPLAY [--verify] [--top N]
+"""
+
+import argparse
+import json
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+VERSION = 1
+
+# Marker written after a move that hit a mine
+MINE = -1
+
+
+class ReplayWriter():
+    """
+Writes a replay of one game to an open text file.
+"""
+
+    def __init__(self, file, game, ai):
+        """Writes the header describing the board and AI."""
+        self.file = file
+        header = {
+            "version": VERSION,
+            "height": game.height,
+            "width": game.width,
+            "mines": int(game.board.sum()),
+            "seed": game.seed,
+            "ai_seed": ai.seed,
+            "solver": ai.use_solver,
+        }
+        file.write(json.dumps(header) + "\n")
+
+    def step(self, move, opened):
+        """Records a move and the (cell, count) pairs it revealed."""
+        line = [move[0], move[1]]
+        for (i, j), count in opened:
+            line.extend((i, j, count))
+        self.file.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def mine(self, move):
+        """Records a move that hit a mine."""
+        self.file.write(json.dumps([move[0], move[1], MINE], separators=(",", ":")) + "\n")
+
+
+def read(file):
+    """
+Reads a replay from an open text file.
+Returns the header and a list of (move, opened) steps, where opened is None
+for a move that hit a mine.
+    """
+    header = json.loads(file.readline())
+    if header.get("version") != VERSION:
+        raise ValueError(f"unsupported replay version {header.get('version')}")
+
+    steps = []
+    for line in file:
+        values = json.loads(line)
+        move = (values[0], values[1])
+        if values[2:] == [MINE]:
+            steps.append((move, None))
+        else:
+            rest = values[2:]
+            opened = [((rest[k], rest[k + 1]), rest[k + 2])
+                      for k in range(0, len(rest), 3)]
+            steps.append((move, opened))
+    return header, steps
+
+
+def replay(header, steps, verify=False):
+    """
+Re-drives a fresh AI with the recorded observations.
+If verify is True, the board is regenerated from its seed and every recorded
+count is checked against it.
+Returns the AI and the time taken by each add_knowledge_batch call.
+    """
+    ai = MinesweeperAI(height=header["height"], width=header["width"],
+                       use_solver=header["solver"], seed=header["ai_seed"])
+    board = None
+    if verify:
+        board = Minesweeper(header["height"], header["width"],
+                            header["mines"], seed=header["seed"])
+
+    timings = []
+    for move, opened in steps:
+        if board is not None:
+            if opened is None:
+                if not board.is_mine(move):
+                    raise ValueError(f"replay says {move} is a mine, board disagrees")
+            else:
+                for cell, count in opened:
+                    if board.nearby_mines(cell) != count:
+                        raise ValueError(f"replay count for {cell} disagrees with board")
+        if opened is None:
+            break
+        start = time.perf_counter()
+        ai.add_knowledge_batch(opened)
+        timings.append(time.perf_counter() - start)
+    return ai, timings
+
+
+def record_game(file, height, width, mines, seed=None, use_solver=False):
+    """
+Plays one game with the AI and writes its replay to an open text file.
+Returns True if the game was won.
+    """
+    game = Minesweeper(height=height, width=width, mines=mines, seed=seed)
+    ai = MinesweeperAI(height=height, width=width, use_solver=use_solver, seed=seed)
+    writer = ReplayWriter(file, game, ai)
+
+    safe_cells = height * width - mines
+    revealed = 0
+    while revealed < safe_cells:
+        move = ai.make_safe_move() or ai.make_random_move()
+        if move is None:
+            break
+        if game.is_mine(move):
+            writer.mine(move)
+            return False
+        opened = game.reveal(move)
+        writer.step(move, opened)
+        ai.add_knowledge_batch(opened)
+        revealed += len(opened)
+    return revealed == safe_cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay Minesweeper games.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="play a game and save its replay")
+    record_parser.add_argument("output")
+    record_parser.add_argument("--seed", type=int, default=0)
+    record_parser.add_argument("--height", type=int, default=16)
+    record_parser.add_argument("--width", type=int, default=30)
+    record_parser.add_argument("--mines", type=int, default=99)
+    record_parser.add_argument("--solver", action="store_true")
+
+    run_parser = commands.add_parser("run", help="replay a game and time every step")
+    run_parser.add_argument("replay")
+    run_parser.add_argument("--verify", action="store_true",
+                            help="check recorded counts against the seeded board")
+    run_parser.add_argument("--top", type=int, default=5,
+                            help="number of slowest steps to list")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        with open(args.output, "w") as f:
+            won = record_game(f, args.height, args.width, args.mines,
+                              args.seed, args.solver)
+        print(f"{'Won' if won else 'Lost'}; replay written to {args.output}")
+
+    else:
+        with open(args.replay) as f:
+            header, steps = read(f)
+        ai, timings = replay(header, steps, args.verify)
+        total = sum(timings)
+        print(f"{len(timings)} steps replayed in {total * 1000:.2f} ms "
+              f"({len(ai.knowledge)} sentences at the end)")
+        slowest = sorted(range(len(timings)), key=lambda k: timings[k], reverse=True)
+        for k in slowest[:args.top]:
+            print(f"    step {k}: move {steps[k][0]}, {len(steps[k][1])} cells, "
+                  f"{timings[k] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
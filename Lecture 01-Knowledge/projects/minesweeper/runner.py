@@ -1,7 +1,27 @@
-import pygame
-import sys
+"""
+Minesweeper runner.
+
+Runs the pygame interface by default. With --headless the same game logic is
+driven by commands read from stdin, one per line, and the state is written to
+stdout as JSON lines, so no display or pygame import is needed:
+
+    reveal I J    reveal the cell at row I, column J
+    flag I J      toggle a flag on the cell at row I, column J
+    ai            let the AI make a move
+    show          print the current state
+    reset         start a new game
+    quit          exit
+"""
+
 import time
 
+# Recorded before anything else so startup time covers all imports
+STARTED = time.perf_counter()
+
+import argparse
+import json
+import sys
+
 from minesweeper import Minesweeper, MinesweeperAI
 
 # Board dimensions and number of mines
@@ -14,56 +34,248 @@ BLACK = (0, 0, 0)
 GRAY = (180, 180, 180)
 WHITE = (255, 255, 255)
 
-# Initialize pygame and screen
-pygame.init()
-size = width, height = 600, 400
-screen = pygame.display.set_mode(size)
-
-# Fonts
-OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
-smallFont = pygame.font.Font(OPEN_SANS, 20)
-mediumFont = pygame.font.Font(OPEN_SANS, 28)
-largeFont = pygame.font.Font(OPEN_SANS, 40)
-
-# Board layout calculations
-BOARD_PADDING = 20
-board_width = ((2 / 3) * width) - (BOARD_PADDING * 2)
-board_height = height - (BOARD_PADDING * 2)
-cell_size = int(min(board_width / WIDTH, board_height / HEIGHT))
-board_origin = (BOARD_PADDING, BOARD_PADDING)
-
-# Load and resize images
-flag = pygame.image.load("assets/images/flag.png")
-flag = pygame.transform.scale(flag, (cell_size, cell_size))
-mine = pygame.image.load("assets/images/mine.png")
-mine = pygame.transform.scale(mine, (cell_size, cell_size))
-
-# Create game logic + AI
-game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-
-# Track game state
-revealed = set()   # Cells revealed by user or AI
-flags = set()      # Cells flagged as mines
-lost = False       # Game-over condition
-instructions = True  # Show rules before game starts
-
-# -------------------------------
-# Main game loop
-# -------------------------------
-while True:
-
-    # Check quit event
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-
-    screen.fill(BLACK)
-
-    # Instructions screen (before playing)
-    if instructions:
+# Frame rate cap for the graphical interface
+FPS = 30
+
+
+class Game():
+    """
+Game state shared by the graphical and headless front ends:
+the board, the AI, and the cells revealed and flagged so far.
+"""
+
+    def __init__(self, height=HEIGHT, width=WIDTH, mines=MINES):
+        self.height = height
+        self.width = width
+        self.mine_count = mines
+        self.reset()
+
+    def reset(self):
+        """Starts a new game with a fresh board and AI."""
+        self.game = Minesweeper(height=self.height, width=self.width, mines=self.mine_count)
+        self.ai = MinesweeperAI(height=self.height, width=self.width)
+        self.revealed = set()   # Cells revealed by user or AI
+        self.flags = set()      # Cells flagged as mines
+        self.lost = False       # Game-over condition
+        self.changed = set()    # Cells whose appearance changed since last drawn
+
+    def won(self):
+        """Checks whether every mine has been flagged."""
+        return self.game.mines == self.flags
+
+    def toggle_flag(self, cell):
+        """Flags or unflags an unrevealed cell."""
+        self.game.validate(cell)
+        if self.lost or cell in self.revealed:
+            return
+        if cell in self.flags:
+            self.flags.remove(cell)
+        else:
+            self.flags.add(cell)
+        self.changed.add(cell)
+
+    def reveal(self, cell):
+        """
+Reveals a cell. Stepping on a mine loses the game; otherwise the cell and any
+zero cascade are opened and the AI is told about all of them at once.
+Raises ValueError for a cell that is not on the board.
+        """
+        self.game.validate(cell)
+        if self.lost or cell in self.flags or cell in self.revealed:
+            return
+        if self.game.is_mine(cell):
+            self.lost = True
+            self.changed.update(self.game.mines)
+        else:
+            # Open the cell plus any zero cascade and update the AI once
+            opened = self.game.reveal(cell)
+            opened_cells = [opened_cell for opened_cell, _ in opened]
+            self.revealed.update(opened_cells)
+            self.flags.difference_update(opened_cells)
+            self.changed.update(opened_cells)
+            self.ai.add_knowledge_batch(opened)
+
+    def ai_move(self):
+        """
+Lets the AI choose and reveal a cell.
+Returns a short description of the kind of move made.
+        """
+        if self.lost:
+            return None
+        move = self.ai.make_safe_move()
+        if move is None:
+            move = self.ai.make_random_move()
+            if move is None:
+                self.changed.update(self.flags ^ self.ai.mines)
+                self.flags = self.ai.mines.copy()
+                return "No moves left to make."
+            message = "No known safe moves, AI making random move."
+        else:
+            message = "AI making safe move."
+        self.reveal(move)
+        return message
+
+    def state(self):
+        """Returns a JSON-serializable description of the game."""
+        return {
+            "revealed": {f"{i},{j}": self.game.nearby_mines((i, j))
+                         for i, j in sorted(self.revealed)},
+            "flags": sorted(self.flags),
+            "lost": self.lost,
+            "won": self.won(),
+        }
+
+
+def run_headless(commands=sys.stdin, output=sys.stdout, game=None):
+    """
+Plays games from text commands (see module docstring) and writes the state
+after each command as a JSON line.
+    """
+    game = game or Game()
+    for line in commands:
+        words = line.split()
+        if not words:
+            continue
+        command = words[0].lower()
+        try:
+            reply = {}
+            if command == "quit":
+                break
+            elif command == "reset":
+                game.reset()
+            elif command == "reveal":
+                game.reveal((int(words[1]), int(words[2])))
+            elif command == "flag":
+                game.toggle_flag((int(words[1]), int(words[2])))
+            elif command == "ai":
+                reply["message"] = game.ai_move()
+            elif command != "show":
+                raise ValueError(f"unknown command {command}")
+            reply.update(game.state())
+            game.changed.clear()
+        except Exception as e:
+            reply = {"error": str(e)}
+        output.write(json.dumps(reply) + "\n")
+        output.flush()
+
+
+def run_gui(height=HEIGHT, width=WIDTH, mines=MINES,
+            report_startup=False, report_cpu=False):
+    """
+Opens the pygame window and runs the interactive game loop.
+
+The board is drawn once into a cached surface. After that only the cells
+reported in Game.changed are redrawn, and only their rectangles are sent to
+the display, at no more than FPS frames per second.
+    """
+    import pygame
+
+    # Initialize pygame and screen
+    pygame.init()
+    size = screen_width, screen_height = 600, 400
+    screen = pygame.display.set_mode(size)
+    clock = pygame.time.Clock()
+
+    # Fonts
+    OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
+    smallFont = pygame.font.Font(OPEN_SANS, 20)
+    mediumFont = pygame.font.Font(OPEN_SANS, 28)
+    largeFont = pygame.font.Font(OPEN_SANS, 40)
+
+    # Board layout calculations
+    BOARD_PADDING = 20
+    board_width = ((2 / 3) * screen_width) - (BOARD_PADDING * 2)
+    board_height = screen_height - (BOARD_PADDING * 2)
+    cell_size = max(1, int(min(board_width / width, board_height / height)))
+    board_origin = (BOARD_PADDING, BOARD_PADDING)
+    border = min(3, max(1, cell_size // 8))
+
+    # Load and resize images
+    flag = pygame.image.load("assets/images/flag.png")
+    flag = pygame.transform.scale(flag, (cell_size, cell_size))
+    mine = pygame.image.load("assets/images/mine.png")
+    mine = pygame.transform.scale(mine, (cell_size, cell_size))
+
+    # Numbers are rendered once and reused
+    numberFont = pygame.font.Font(OPEN_SANS, min(20, max(8, cell_size - 4)))
+    numbers = [numberFont.render(str(n), True, BLACK) for n in range(9)]
+
+    # Buttons
+    aiButton = pygame.Rect((2 / 3) * screen_width + BOARD_PADDING,
+                           (1 / 3) * screen_height - 50,
+                           (screen_width / 3) - BOARD_PADDING * 2, 50)
+    resetButton = pygame.Rect((2 / 3) * screen_width + BOARD_PADDING,
+                              (1 / 3) * screen_height + 20,
+                              (screen_width / 3) - BOARD_PADDING * 2, 50)
+    statusRect = pygame.Rect((2 / 3) * screen_width, (2 / 3) * screen_height - 25,
+                             screen_width / 3, 50)
+
+    # Create game logic + AI
+    game = Game(height, width, mines)
+    board = pygame.Surface((width * cell_size, height * cell_size))
+    board_rect = board.get_rect(topleft=board_origin)
+
+    def cell_rect(cell):
+        """Returns a cell's rectangle within the board surface."""
+        i, j = cell
+        return pygame.Rect(j * cell_size, i * cell_size, cell_size, cell_size)
+
+    def cell_at(position):
+        """Returns the cell under a screen position, or None."""
+        x = position[0] - board_origin[0]
+        y = position[1] - board_origin[1]
+        if 0 <= x < width * cell_size and 0 <= y < height * cell_size:
+            return (y // cell_size, x // cell_size)
+        return None
+
+    def draw_cell(cell):
+        """Draws one cell onto the board surface and returns its screen rectangle."""
+        rect = cell_rect(cell)
+        pygame.draw.rect(board, GRAY, rect)
+        pygame.draw.rect(board, WHITE, rect, border)
+
+        # Show mine/flag/number if revealed
+        if game.lost and game.game.is_mine(cell):
+            board.blit(mine, rect)  # Reveal mine only if game lost
+        elif cell in game.flags:
+            board.blit(flag, rect)  # Player-flagged mine
+        elif cell in game.revealed:
+            neighbors = numbers[game.game.nearby_mines(cell)]
+            board.blit(neighbors, neighbors.get_rect(center=rect.center))
+        return rect.move(board_origin)
+
+    def draw_board():
+        """Draws every cell onto the board surface."""
+        board.fill(BLACK)
+        for i in range(height):
+            for j in range(width):
+                draw_cell((i, j))
+        game.changed.clear()
+
+    def draw_status():
+        """Draws the win/loss text and returns its rectangle."""
+        pygame.draw.rect(screen, BLACK, statusRect)
+        text = "Lost" if game.lost else "Won" if game.won() else ""
+        text = mediumFont.render(text, True, WHITE)
+        screen.blit(text, text.get_rect(center=statusRect.center))
+        return statusRect
+
+    def draw_screen():
+        """Draws the whole game screen from the cached board."""
+        screen.fill(BLACK)
+        screen.blit(board, board_rect)
+        pygame.draw.rect(screen, WHITE, aiButton)
+        screen.blit(mediumFont.render("AI Move", True, BLACK), aiButton.move(40, 10))
+        pygame.draw.rect(screen, WHITE, resetButton)
+        screen.blit(mediumFont.render("Reset", True, BLACK), resetButton.move(50, 10))
+        draw_status()
+        pygame.display.flip()
+
+    def draw_instructions():
+        """Draws the instructions screen and returns the play button."""
+        screen.fill(BLACK)
         title = largeFont.render("Play Minesweeper", True, WHITE)
-        titleRect = title.get_rect(center=((width / 2), 50))
+        titleRect = title.get_rect(center=((screen_width / 2), 50))
         screen.blit(title, titleRect)
 
         # Game rules
@@ -74,142 +286,117 @@ while True:
         ]
         for i, rule in enumerate(rules):
             line = smallFont.render(rule, True, WHITE)
-            lineRect = line.get_rect(center=((width / 2), 150 + 30 * i))
+            lineRect = line.get_rect(center=((screen_width / 2), 150 + 30 * i))
             screen.blit(line, lineRect)
 
         # Play button
-        buttonRect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
+        buttonRect = pygame.Rect((screen_width / 4), (3 / 4) * screen_height,
+                                 screen_width / 2, 50)
         buttonText = mediumFont.render("Play Game", True, BLACK)
         buttonTextRect = buttonText.get_rect(center=buttonRect.center)
         pygame.draw.rect(screen, WHITE, buttonRect)
         screen.blit(buttonText, buttonTextRect)
+        pygame.display.flip()
+        return buttonRect
 
-        # If clicked → start game
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if buttonRect.collidepoint(mouse):
-                instructions = False
-                time.sleep(0.3)
+    instructions = True  # Show rules before game starts
+    buttonRect = draw_instructions()
+    if report_startup:
+        report_startup_time("gui")
 
-        pygame.display.flip()
-        continue
+    # Track CPU use of the loop for --cpu-stats
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
 
     # -------------------------------
-    # Draw Minesweeper board
+    # Main game loop
     # -------------------------------
-    cells = []
-    for i in range(HEIGHT):
-        row = []
-        for j in range(WIDTH):
-            # Draw gray square for cell
-            rect = pygame.Rect(
-                board_origin[0] + j * cell_size,
-                board_origin[1] + i * cell_size,
-                cell_size, cell_size
-            )
-            pygame.draw.rect(screen, GRAY, rect)
-            pygame.draw.rect(screen, WHITE, rect, 3)
-
-            # Show mine/flag/number if revealed
-            if game.is_mine((i, j)) and lost:
-                screen.blit(mine, rect)  # Reveal mine only if game lost
-            elif (i, j) in flags:
-                screen.blit(flag, rect)  # Player-flagged mine
-            elif (i, j) in revealed:
-                neighbors = smallFont.render(
-                    str(game.nearby_mines((i, j))), True, BLACK
-                )
-                neighborsTextRect = neighbors.get_rect(center=rect.center)
-                screen.blit(neighbors, neighborsTextRect)
-
-            row.append(rect)
-        cells.append(row)
+    while True:
+        clock.tick(FPS)
 
-    # -------------------------------
-    # Buttons: AI Move / Reset
-    # -------------------------------
-    aiButton = pygame.Rect((2 / 3) * width + BOARD_PADDING,
-                           (1 / 3) * height - 50,
-                           (width / 3) - BOARD_PADDING * 2, 50)
-    pygame.draw.rect(screen, WHITE, aiButton)
-    screen.blit(mediumFont.render("AI Move", True, BLACK), aiButton.move(40, 10))
-
-    resetButton = pygame.Rect((2 / 3) * width + BOARD_PADDING,
-                              (1 / 3) * height + 20,
-                              (width / 3) - BOARD_PADDING * 2, 50)
-    pygame.draw.rect(screen, WHITE, resetButton)
-    screen.blit(mediumFont.render("Reset", True, BLACK), resetButton.move(50, 10))
-
-    # Win/Loss display
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
-    text = mediumFont.render(text, True, WHITE)
-    textRect = text.get_rect(center=((5 / 6) * width, (2 / 3) * height))
-    screen.blit(text, textRect)
-
-    move = None  # Default (no move yet)
-    left, _, right = pygame.mouse.get_pressed()
+        if report_cpu and time.perf_counter() - wall_start >= 5:
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            print(f"CPU: {100 * cpu / wall:.1f}%", file=sys.stderr)
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
 
-    # -------------------------------
-    # Player input
-    # -------------------------------
-    # Right-click → toggle flag
-    if right == 1 and not lost:
-        mouse = pygame.mouse.get_pos()
-        for i in range(HEIGHT):
-            for j in range(WIDTH):
-                if cells[i][j].collidepoint(mouse) and (i, j) not in revealed:
-                    if (i, j) in flags:
-                        flags.remove((i, j))
-                    else:
-                        flags.add((i, j))
-                    time.sleep(0.2)
-
-    # Left-click → AI button / Reset / Reveal cell
-    elif left == 1:
-        mouse = pygame.mouse.get_pos()
-
-        # AI move
-        if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
-            time.sleep(0.2)
-
-        # Reset button
-        elif resetButton.collidepoint(mouse):
-            game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
-            revealed = set()
-            flags = set()
-            lost = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                sys.exit()
+            if event.type != pygame.MOUSEBUTTONDOWN:
+                continue
+
+            # Instructions screen: wait for the play button
+            if instructions:
+                if event.button == 1 and buttonRect.collidepoint(event.pos):
+                    instructions = False
+                    draw_board()
+                    draw_screen()
+                continue
+
+            cell = cell_at(event.pos)
+
+            # Right-click → toggle flag
+            if event.button == 3 and cell is not None:
+                game.toggle_flag(cell)
+
+            elif event.button == 1:
+                # AI move
+                if aiButton.collidepoint(event.pos):
+                    message = game.ai_move()
+                    if message:
+                        print(message)
+
+                # Reset button
+                elif resetButton.collidepoint(event.pos):
+                    game.reset()
+                    draw_board()
+                    draw_screen()
+
+                # Reveal clicked cell
+                elif cell is not None:
+                    game.reveal(cell)
+
+        if instructions or not game.changed:
             continue
 
-        # Reveal clicked cell
-        elif not lost:
-            for i in range(HEIGHT):
-                for j in range(WIDTH):
-                    if (cells[i][j].collidepoint(mouse)
-                        and (i, j) not in flags
-                        and (i, j) not in revealed):
-                        move = (i, j)
+        # Redraw only the cells that changed, plus the status text
+        dirty = [draw_cell(cell) for cell in game.changed]
+        game.changed.clear()
+        for rect in dirty:
+            screen.blit(board, rect, rect.move(-board_origin[0], -board_origin[1]))
+        dirty.append(draw_status())
+        pygame.display.update(dirty)
+
+
+def report_startup_time(mode):
+    """Prints the time from process start until the runner was ready."""
+    elapsed = time.perf_counter() - STARTED
+    print(f"{mode} startup: {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Minesweeper with an AI helper.")
+    parser.add_argument("--headless", action="store_true",
+                        help="read commands from stdin instead of opening a window")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="report how long startup took on stderr")
+    parser.add_argument("--cpu-stats", action="store_true",
+                        help="report CPU usage of the window loop every 5 seconds")
+    parser.add_argument("--height", type=int, default=HEIGHT)
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--mines", type=int, default=MINES)
+    args = parser.parse_args()
+
+    if args.headless:
+        if args.startup_time:
+            report_startup_time("headless")
+        run_headless(game=Game(args.height, args.width, args.mines))
+    else:
+        run_gui(args.height, args.width, args.mines,
+                args.startup_time, args.cpu_stats)
 
-    # -------------------------------
-    # Apply chosen move
-    # -------------------------------
-    if move:
-        if game.is_mine(move):
-            lost = True
-        else:
-            nearby = game.nearby_mines(move)
-            revealed.add(move)
-            ai.add_knowledge(move, nearby)
 
-    pygame.display.flip()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Headless Minesweeper simulation and win-rate benchmark.
+
+Plays many seeded games of Minesweeper with MinesweeperAI across a process
+pool and reports win rate, throughput, add_knowledge latency, knowledge-base
+growth and peak memory as JSON.
+
+Usage: python simulate.py [--games N] [--difficulty LEVEL ...] [--workers N]
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+from replay import ReplayWriter
+
+# Standard board sizes: (height, width, mines)
+DIFFICULTIES = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+# Latency percentiles reported for add_knowledge
+PERCENTILES = (50, 90, 99, 100)
+
+# Number of points in the knowledge-base size curve
+CURVE_POINTS = 20
+
+
+def play_game(args):
+    """
+Plays a single seeded game from start to finish without any UI.
+Returns a dictionary describing the outcome and per-move measurements.
+    """
+    height, width, mines, seed, use_solver, record_dir, record_ms = args
+
+    game = Minesweeper(height=height, width=width, mines=mines, seed=seed)
+    ai = MinesweeperAI(height=height, width=width, use_solver=use_solver, seed=seed)
+
+    # Keep a replay in memory in case the game turns out worth saving
+    log = io.StringIO() if record_dir else None
+    writer = ReplayWriter(log, game, ai) if log else None
+
+    safe_cells = height * width - mines
+    revealed = 0
+    won = False
+    guesses = 0
+    latencies = []
+    knowledge_sizes = []
+
+    start = time.perf_counter()
+    while True:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            guesses += 1
+
+        # Stepping on a mine ends the game
+        if game.is_mine(move):
+            if writer:
+                writer.mine(move)
+            break
+
+        # Reveal the cell (and any zero cascade) and tell the AI in one batch
+        opened = game.reveal(move)
+        if writer:
+            writer.step(move, opened)
+        before = time.perf_counter()
+        ai.add_knowledge_batch(opened)
+        latencies.append(time.perf_counter() - before)
+        knowledge_sizes.append(len(ai.knowledge))
+
+        revealed += len(opened)
+        if revealed == safe_cells:
+            won = True
+            break
+    elapsed = time.perf_counter() - start
+
+    # Save replays of lost games and games with a step slower than record_ms
+    if log and (not won or max(latencies, default=0) * 1000 >= record_ms):
+        path = os.path.join(record_dir, f"{height}x{width}-{mines}-seed{seed}.replay")
+        with open(path, "w") as f:
+            f.write(log.getvalue())
+
+    return {
+        "seed": seed,
+        "won": won,
+        "moves": len(latencies),
+        "guesses": guesses,
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "knowledge_sizes": knowledge_sizes,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def percentile(values, p):
+    """
+Returns the p-th percentile of a sorted list using the nearest-rank method.
+    """
+    if not values:
+        return None
+    rank = max(1, -(-p * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+def knowledge_curve(games):
+    """
+Averages knowledge-base size across games at evenly spaced points of progress.
+Each game is resampled by the fraction of its moves completed, so games of
+different lengths can be combined into a single curve.
+    """
+    curve = []
+    for point in range(1, CURVE_POINTS + 1):
+        fraction = point / CURVE_POINTS
+        samples = []
+        for game in games:
+            sizes = game["knowledge_sizes"]
+            if sizes:
+                samples.append(sizes[max(0, int(fraction * len(sizes)) - 1)])
+        mean = sum(samples) / len(samples) if samples else 0
+        curve.append({"progress": fraction, "mean_size": round(mean, 2)})
+    return curve
+
+
+def summarize(name, board, games):
+    """
+Combines the results of many games on one board size into a report.
+    """
+    height, width, mines = board
+    moves = sum(game["moves"] for game in games)
+    elapsed = sum(game["elapsed"] for game in games)
+    latencies = sorted(
+        latency for game in games for latency in game["latencies"]
+    )
+    wins = sum(1 for game in games if game["won"])
+
+    return {
+        "difficulty": name,
+        "height": height,
+        "width": width,
+        "mines": mines,
+        "games": len(games),
+        "wins": wins,
+        "win_rate": wins / len(games) if games else 0,
+        "moves": moves,
+        "guesses": sum(game["guesses"] for game in games),
+        "moves_per_second": moves / elapsed if elapsed else 0,
+        "add_knowledge_ms": {
+            f"p{p}": round(percentile(latencies, p) * 1000, 4)
+            if latencies else None
+            for p in PERCENTILES
+        },
+        "knowledge_size": knowledge_curve(games),
+        "peak_rss_kb": max((game["max_rss_kb"] for game in games), default=0),
+    }
+
+
+def run(difficulties, games, workers, seed, use_solver=False,
+        record_dir=None, record_ms=0):
+    """
+Plays the requested number of games for each difficulty across a pool of
+worker processes and returns the combined report.
+    """
+    report = {"games_per_difficulty": games, "workers": workers,
+              "seed": seed, "solver": use_solver, "results": []}
+
+    with multiprocessing.Pool(workers) as pool:
+        for name in difficulties:
+            board = DIFFICULTIES[name]
+            tasks = [(*board, seed + n, use_solver, record_dir, record_ms)
+                     for n in range(games)]
+            chunksize = max(1, games // (workers * 4))
+            results = list(pool.imap_unordered(play_game, tasks, chunksize))
+            results.sort(key=lambda game: game["seed"])
+            report["results"].append(summarize(name, board, results))
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play seeded Minesweeper games headlessly and report statistics."
+    )
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games to play per difficulty")
+    parser.add_argument("--difficulty", nargs="+", choices=DIFFICULTIES,
+                        default=list(DIFFICULTIES),
+                        help="board sizes to play")
+    parser.add_argument("--workers", type=int,
+                        default=multiprocessing.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game")
+    parser.add_argument("--solver", action="store_true",
+                        help="use the linear-algebra frontier solver")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save replays of lost or slow games in this directory")
+    parser.add_argument("--record-ms", type=float, default=float("inf"),
+                        help="also save won games with a step slower than this")
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    report = run(args.difficulty, args.games, args.workers, args.seed,
+                 args.solver, args.record, args.record_ms)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
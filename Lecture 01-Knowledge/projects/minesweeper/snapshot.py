@@ -0,0 +1,138 @@
+"""
+Compact binary snapshots of MinesweeperAI knowledge state.
+
+A snapshot holds everything needed to pause a game and resume it in another
+process: the board size, settings, the played/mine/safe cell sets as bitmasks
+over the board, the pending safe-move queue, every sentence, and the state of
+the AI's random number generator.
+
+Layout (little-endian):
+
+    header      magic "MSAI", version u8, height u32, width u32, flags u8
+    cell sets   moves_made, mines, safes: each a bitmask of ceil(h*w/8) bytes
+    queue       length u32, then one u32 cell index per pending safe cell
+    sentences   count u32, then per sentence: mine count i32, length u32,
+                and one u32 cell index per cell
+    rng         625 u32 words of Mersenne Twister state
+
+Cells are stored as flat indices i * width + j.
+"""
+
+import struct
+from collections import deque
+
+from minesweeper import MinesweeperAI, Sentence
+
+MAGIC = b"MSAI"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBIIB")
+UINT = struct.Struct("<I")
+SENTENCE = struct.Struct("<iI")
+RNG_WORDS = 625
+
+# Flag bits in the header
+USE_SOLVER = 1
+HAS_SEED = 2
+
+
+def pack_cells(cells, width, size):
+    """Encodes a set of cells as a bitmask of the given length in bytes."""
+    bits = bytearray(size)
+    for i, j in cells:
+        index = i * width + j
+        bits[index >> 3] |= 1 << (index & 7)
+    return bits
+
+
+def unpack_cells(data, offset, size, width):
+    """Decodes a bitmask into a set of cells."""
+    cells = set()
+    for position in range(size):
+        byte = data[offset + position]
+        while byte:
+            low = byte & -byte
+            index = (position << 3) + low.bit_length() - 1
+            cells.add(divmod(index, width))
+            byte ^= low
+    return cells
+
+
+def dumps(ai):
+    """Returns a binary snapshot of an AI's state."""
+    width = ai.width
+    size = (ai.height * width + 7) // 8
+    has_seed = isinstance(ai.seed, int) and -2 ** 63 <= ai.seed < 2 ** 63
+    flags = (USE_SOLVER if ai.use_solver else 0) | (HAS_SEED if has_seed else 0)
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, ai.height, width, flags),
+        pack_cells(ai.moves_made, width, size),
+        pack_cells(ai.mines, width, size),
+        pack_cells(ai.safes, width, size),
+    ]
+
+    # Only the queued cells that are still playable matter
+    queue = [i * width + j for i, j in ai.safe_queue
+             if (i, j) not in ai.moves_made and (i, j) not in ai.mines]
+    parts.append(UINT.pack(len(queue)))
+    parts.append(struct.pack(f"<{len(queue)}I", *queue))
+
+    sentences = [sentence for sentence in ai.knowledge if sentence.cells]
+    parts.append(UINT.pack(len(sentences)))
+    for sentence in sentences:
+        cells = [i * width + j for i, j in sentence.cells]
+        parts.append(SENTENCE.pack(sentence.count, len(cells)))
+        parts.append(struct.pack(f"<{len(cells)}I", *cells))
+
+    _, state, _ = ai.rng.getstate()
+    parts.append(struct.pack(f"<{RNG_WORDS}I", *state))
+
+    if has_seed:
+        parts.append(struct.pack("<q", ai.seed))
+
+    return b"".join(parts)
+
+
+def loads(data):
+    """Rebuilds an AI from a snapshot made by dumps."""
+    magic, version, height, width, flags = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a MinesweeperAI snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    offset = HEADER.size
+    size = (height * width + 7) // 8
+
+    ai = MinesweeperAI(height=height, width=width, use_solver=bool(flags & USE_SOLVER))
+
+    ai.moves_made = unpack_cells(data, offset, size, width)
+    ai.mines = unpack_cells(data, offset + size, size, width)
+    ai.safes = unpack_cells(data, offset + 2 * size, size, width)
+    offset += 3 * size
+
+    (length,) = UINT.unpack_from(data, offset)
+    offset += UINT.size
+    queue = struct.unpack_from(f"<{length}I", data, offset)
+    ai.safe_queue = deque(divmod(index, width) for index in queue)
+    offset += 4 * length
+
+    (count,) = UINT.unpack_from(data, offset)
+    offset += UINT.size
+    ai.knowledge = []
+    for _ in range(count):
+        mines, length = SENTENCE.unpack_from(data, offset)
+        offset += SENTENCE.size
+        cells = struct.unpack_from(f"<{length}I", data, offset)
+        offset += 4 * length
+        ai.knowledge.append(Sentence((divmod(index, width) for index in cells), mines))
+
+    state = struct.unpack_from(f"<{RNG_WORDS}I", data, offset)
+    offset += 4 * RNG_WORDS
+    ai.rng.setstate((3, state, None))
+
+    if flags & HAS_SEED:
+        (ai.seed,) = struct.unpack_from("<q", data, offset)
+
+    # Unknown cells are rebuilt by the AI when it needs them
+    return ai
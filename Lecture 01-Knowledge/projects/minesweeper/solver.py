@@ -0,0 +1,130 @@
+"""
+Linear-algebra constraint solver for Minesweeper frontiers.
+
+Every sentence "these cells contain exactly N mines" is a linear equation over
+0/1 variables. Row-reducing the system with fraction-free integer Gaussian
+elimination combines any number of overlapping sentences at once, and the 0/1
+bounds on each reduced row then prove cells to be mines or safe.
+"""
+
+import numpy as np
+
+
+def components(sentences):
+    """
+Groups sentences into independent components that share no cells.
+Returns a list of lists of sentences.
+    """
+    parent = {}
+
+    def find(cell):
+        root = cell
+        while parent[root] != root:
+            root = parent[root]
+        # Compress the path so later lookups are fast
+        while parent[cell] != root:
+            parent[cell], cell = root, parent[cell]
+        return root
+
+    for sentence in sentences:
+        cells = iter(sentence.cells)
+        first = next(cells)
+        parent.setdefault(first, first)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            a, b = find(first), find(cell)
+            if a != b:
+                parent[b] = a
+
+    groups = {}
+    for sentence in sentences:
+        groups.setdefault(find(next(iter(sentence.cells))), []).append(sentence)
+    return list(groups.values())
+
+
+def row_reduce(matrix):
+    """
+Reduces an integer augmented matrix to reduced row echelon form in place,
+without fractions: every elimination step cross-multiplies the rows and then
+divides each row by the gcd of its entries to keep the numbers small.
+Returns the number of nonzero rows.
+    """
+    rows, columns = matrix.shape
+    pivot_row = 0
+    for column in range(columns - 1):
+        if pivot_row == rows:
+            break
+
+        # Find a row with a nonzero entry in this column
+        candidates = np.flatnonzero(matrix[pivot_row:, column])
+        if not len(candidates):
+            continue
+        swap = pivot_row + candidates[0]
+        if swap != pivot_row:
+            matrix[[pivot_row, swap]] = matrix[[swap, pivot_row]]
+
+        # Eliminate the column from every other row at once
+        pivot = matrix[pivot_row]
+        others = np.flatnonzero(matrix[:, column])
+        others = others[others != pivot_row]
+        if len(others):
+            factors = matrix[others, column][:, None]
+            matrix[others] = matrix[others] * pivot[column] - factors * pivot
+            divisors = np.gcd.reduce(matrix[others], axis=1)
+            divisors[divisors == 0] = 1
+            matrix[others] //= divisors[:, None]
+
+        pivot_row += 1
+
+    return pivot_row
+
+
+def solve(sentences, cells=None):
+    """
+Finds every cell that the given sentences prove to be a mine or safe.
+If cells is given, only components containing one of those cells are solved,
+so a move only pays for the part of the frontier it changed.
+Returns a tuple (mines, safes) of sets of cells.
+
+For each reduced row sum(a_k * x_k) = c with x_k in {0, 1}, the left side is
+at least the sum of the negative coefficients and at most the sum of the
+positive ones. If c equals one of those bounds, every variable in the row is
+forced to the value that attains it.
+    """
+    mines = set()
+    safes = set()
+
+    for group in components([s for s in sentences if s.cells]):
+        if cells is not None and not any(s.cells & cells for s in group):
+            continue
+
+        variables = sorted(set().union(*(sentence.cells for sentence in group)))
+        column = {cell: k for k, cell in enumerate(variables)}
+
+        # Build the augmented matrix [A | b]
+        matrix = np.zeros((len(group), len(variables) + 1), dtype=np.int64)
+        for row, sentence in enumerate(group):
+            matrix[row, [column[cell] for cell in sentence.cells]] = 1
+            matrix[row, -1] = sentence.count
+
+        rank = row_reduce(matrix)
+        coefficients = matrix[:rank, :-1]
+        totals = matrix[:rank, -1]
+
+        positive = coefficients > 0
+        negative = coefficients < 0
+        low = np.where(negative, coefficients, 0).sum(axis=1)
+        high = np.where(positive, coefficients, 0).sum(axis=1)
+
+        # Rows at their lower bound: negative terms are mines, positive safe
+        at_low = (totals == low)[:, None]
+        # Rows at their upper bound: positive terms are mines, negative safe
+        at_high = (totals == high)[:, None]
+
+        mine_mask = ((at_low & negative) | (at_high & positive)).any(axis=0)
+        safe_mask = ((at_low & positive) | (at_high & negative)).any(axis=0)
+
+        mines.update(variables[k] for k in np.flatnonzero(mine_mask))
+        safes.update(variables[k] for k in np.flatnonzero(safe_mask))
+
+    return mines, safes
@@ -0,0 +1,358 @@
+"""
+Sparse, chunked Minesweeper for boards with millions of cells.
+
+The board is split into square chunks. The mines of a chunk are generated the
+first time any of its cells is looked at, from a generator seeded with the
+board seed and the chunk coordinates, and kept in a hashed set. The same seed
+therefore always gives the same board no matter in which order chunks are
+visited, and only chunks near played cells ever exist in memory.
+
+SparseMinesweeperAI files every sentence under the chunk of the cell that
+produced it. A sentence only ever mentions neighbors of that cell, so solving
+around a cell only looks at the chunks next to it. Marking a cell goes through
+an index from each frontier cell to the sentences mentioning it. Memory grows
+with the revealed area and its frontier instead of with the board.
+
+Usage: python sparse.py [--height H] [--width W] [--density D] [--moves N]
+"""
+
+import argparse
+import json
+import random
+import resource
+import time
+from collections import deque
+
+import numpy as np
+
+import solver
+from minesweeper import MinesweeperAI, Sentence
+
+# Side length of a chunk in cells
+CHUNK = 32
+
+
+def neighbors(cell, height, width):
+    """Yields the cells around a cell that lie on the board."""
+    i, j = cell
+    for ni in range(max(0, i - 1), min(height, i + 2)):
+        for nj in range(max(0, j - 1), min(width, j + 2)):
+            if (ni, nj) != cell:
+                yield ni, nj
+
+
+class SparseMinesweeper():
+    """
+Minesweeper board whose mines are generated lazily, one chunk at a time.
+Each chunk holds round(density * cells in chunk) mines.
+"""
+
+    def __init__(self, height, width, density=0.15, seed=None, chunk_size=CHUNK):
+        """
+Initialize an empty board. No mines are placed until a chunk is first used.
+        """
+        self.height = height
+        self.width = width
+        self.density = density
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.chunk_size = chunk_size
+
+        # Maps chunk coordinates to the set of mines in that chunk
+        self.chunks = {}
+
+        # Track which cells have been revealed
+        self.revealed = set()
+
+    def chunk_of(self, cell):
+        """Returns the coordinates of the chunk containing a cell."""
+        return cell[0] // self.chunk_size, cell[1] // self.chunk_size
+
+    def chunk_mines(self, chunk):
+        """Returns the set of mines in a chunk, generating them on first use."""
+        mines = self.chunks.get(chunk)
+        if mines is None:
+            ci, cj = chunk
+            top, left = ci * self.chunk_size, cj * self.chunk_size
+            rows = min(self.chunk_size, self.height - top)
+            cols = min(self.chunk_size, self.width - left)
+            count = round(self.density * rows * cols)
+
+            rng = np.random.default_rng([self.seed, ci, cj])
+            positions = rng.choice(rows * cols, size=count, replace=False)
+            mines = {(top + int(p) // cols, left + int(p) % cols) for p in positions}
+            self.chunks[chunk] = mines
+        return mines
+
+    @property
+    def mine_count(self):
+        """Total number of mines on the board, computed without generating it."""
+        # Chunks come in at most four shapes: full, and cut off at the bottom or right edge
+        def spans(length):
+            full, rest = divmod(length, self.chunk_size)
+            return [(self.chunk_size, full)] + ([(rest, 1)] if rest else [])
+
+        return sum(round(self.density * rows * cols) * row_count * col_count
+                   for rows, row_count in spans(self.height)
+                   for cols, col_count in spans(self.width))
+
+    def is_mine(self, cell):
+        """Check if a given cell contains a mine."""
+        return cell in self.chunk_mines(self.chunk_of(cell))
+
+    def nearby_mines(self, cell):
+        """
+Returns the number of mines that are within one row and column of a given cell,
+not including the cell itself.
+        """
+        return sum(self.is_mine(neighbor)
+                   for neighbor in neighbors(cell, self.height, self.width))
+
+    def reveal(self, cell):
+        """
+Reveals a safe cell and flood-fills outward through connected zero-count
+cells, like Minesweeper.reveal.
+Returns a list of (cell, count) pairs for all newly revealed cells.
+        """
+        if cell in self.revealed:
+            return []
+
+        opened = []
+        self.revealed.add(cell)
+        frontier = deque([cell])
+        while frontier:
+            current = frontier.popleft()
+            count = self.nearby_mines(current)
+            opened.append((current, count))
+            if count:
+                continue
+            for neighbor in neighbors(current, self.height, self.width):
+                if neighbor not in self.revealed:
+                    self.revealed.add(neighbor)
+                    frontier.append(neighbor)
+
+        return opened
+
+
+class SparseMinesweeperAI(MinesweeperAI):
+    """
+MinesweeperAI for sparse boards, with its knowledge partitioned by chunk.
+Inference always uses the linear-algebra solver, run over the chunks around
+the cells that changed. Forks work as in MinesweeperAI, with own() copying
+the chunked knowledge and the cell index together.
+"""
+
+    def __init__(self, height, width, seed=None, chunk_size=CHUNK):
+        """
+Initialize the AI without enumerating the board.
+        """
+        super().__init__(height, width, use_solver=True, seed=seed)
+        self.chunk_size = chunk_size
+
+        # Maps chunk coordinates to the sentences of cells revealed in it
+        self.knowledge = {}
+
+        # Maps each cell still in some sentence to the sentences mentioning it
+        self.watch = {}
+
+    def own(self):
+        """
+Copies shared state before this AI modifies it (see MinesweeperAI.fork).
+Each sentence is copied once and filed in both the chunk lists and the
+cell index of the copy.
+        """
+        if not self.shared:
+            return
+        self.shared = False
+        self.moves_made = self.moves_made.copy()
+        self.mines = self.mines.copy()
+        self.safes = self.safes.copy()
+        self.safe_queue = self.safe_queue.copy()
+        self.touched = self.touched.copy()
+        if self.unknown is not None:
+            self.unknown = self.unknown.copy()
+
+        copies = {}
+        knowledge = {}
+        for chunk, sentences in self.knowledge.items():
+            knowledge[chunk] = []
+            for sentence in sentences:
+                copies[id(sentence)] = Sentence(sentence.cells, sentence.count)
+                knowledge[chunk].append(copies[id(sentence)])
+        self.knowledge = knowledge
+        self.watch = {cell: [copies[id(sentence)] for sentence in sentences]
+                      for cell, sentences in self.watch.items()}
+
+    def chunks_near(self, cells):
+        """
+Returns the chunks that may hold sentences mentioning any of the cells:
+the chunks of the cells and of their neighbors.
+        """
+        size = self.chunk_size
+        chunks = set()
+        for i, j in cells:
+            for ci in range((i - 1) // size, (i + 1) // size + 1):
+                for cj in range((j - 1) // size, (j + 1) // size + 1):
+                    chunks.add((ci, cj))
+        return chunks
+
+    def sentences_near(self, cells):
+        """Yields the sentences filed under the chunks near the cells."""
+        for chunk in self.chunks_near(cells):
+            yield from self.knowledge.get(chunk, ())
+
+    @property
+    def sentence_count(self):
+        """Number of sentences across all chunks."""
+        return sum(len(sentences) for sentences in self.knowledge.values())
+
+    def mark_mine(self, cell):
+        """Mark a cell as a mine and update the sentences mentioning it."""
+        if cell not in self.mines:
+            self.own()
+            self.mines.add(cell)
+            if self.unknown is not None:
+                self.unknown.discard(cell)
+            for sentence in self.watch.pop(cell, ()):
+                sentence.mark_mine(cell)
+
+    def mark_safe(self, cell):
+        """Mark a cell as safe and update the sentences mentioning it."""
+        if cell not in self.safes:
+            self.own()
+            self.safes.add(cell)
+            if cell not in self.moves_made:
+                self.safe_queue.append(cell)
+            for sentence in self.watch.pop(cell, ()):
+                sentence.mark_safe(cell)
+
+    def add_sentence(self, cell, count):
+        """
+Records a revealed cell as a move and files the sentence formed by its
+unknown neighbors under the cell's chunk, without running inference.
+        """
+        self.own()
+        self.moves_made.add(cell)
+        if self.unknown is not None:
+            self.unknown.discard(cell)
+        self.mark_safe(cell)
+
+        new_cells = set()
+        for neighbor in neighbors(cell, self.height, self.width):
+            if neighbor in self.mines:
+                count -= 1
+            elif neighbor not in self.safes:
+                new_cells.add(neighbor)
+
+        if new_cells:
+            chunk = (cell[0] // self.chunk_size, cell[1] // self.chunk_size)
+            sentence = Sentence(new_cells, count)
+            self.knowledge.setdefault(chunk, []).append(sentence)
+            for neighbor in new_cells:
+                self.watch.setdefault(neighbor, []).append(sentence)
+            self.touched.update(new_cells)
+
+    def infer(self):
+        """
+Solves the sentences around the changed cells, marking every mine and safe
+cell they prove, until nothing new is found. Changed cells are solved one
+chunk at a time together with the sentences of the chunks around it, so each
+linear system stays small however long the frontier grows. Solving only part
+of the knowledge base is sound; it can only miss conclusions that depend on
+sentences more than one chunk away.
+        """
+        self.own()
+        size = self.chunk_size
+        touched, self.touched = self.touched, set()
+        while touched:
+            groups = {}
+            for cell in touched:
+                groups.setdefault((cell[0] // size, cell[1] // size), set()).add(cell)
+
+            # Cells sharing a sentence with a newly marked cell are solved again
+            touched = set()
+            for cells in groups.values():
+                self.prune(self.chunks_near(cells))
+                mines, safes = solver.solve(list(self.sentences_near(cells)), cells)
+                for cell in (mines - self.mines) | (safes - self.safes):
+                    for sentence in self.watch.get(cell, ()):
+                        touched.update(sentence.cells)
+                for mine in mines:
+                    self.mark_mine(mine)
+                for safe in safes:
+                    self.mark_safe(safe)
+            touched -= self.mines
+            touched -= self.safes
+
+    def prune(self, chunks):
+        """Drops empty sentences, and chunks left without any, from the knowledge base."""
+        for chunk in chunks:
+            sentences = self.knowledge.get(chunk)
+            if sentences is None:
+                continue
+            sentences[:] = [s for s in sentences if s.cells]
+            if not sentences:
+                del self.knowledge[chunk]
+
+
+def play(height, width, density, seed, moves):
+    """
+Lets the AI play up to the given number of moves on a sparse board.
+Returns a dictionary of measurements.
+    """
+    game = SparseMinesweeper(height, width, density, seed)
+    ai = SparseMinesweeperAI(height, width, seed)
+
+    played = revealed = guesses = 0
+    lost = False
+    start = time.perf_counter()
+    while played < moves:
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            guesses += 1
+        if game.is_mine(move):
+            lost = True
+            break
+        opened = game.reveal(move)
+        ai.add_knowledge_batch(opened)
+        revealed += len(opened)
+        played += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "height": height,
+        "width": width,
+        "cells": height * width,
+        "mines": game.mine_count,
+        "seed": seed,
+        "moves": played,
+        "guesses": guesses,
+        "lost": lost,
+        "revealed": revealed,
+        "moves_per_second": round(played / elapsed, 1) if elapsed else 0,
+        "chunks_generated": len(game.chunks),
+        "chunks_with_knowledge": len(ai.knowledge),
+        "sentences": ai.sentence_count,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Minesweeper on a huge sparse board.")
+    parser.add_argument("--height", type=int, default=10000)
+    parser.add_argument("--width", type=int, default=10000)
+    parser.add_argument("--density", type=float, default=0.1,
+                        help="fraction of cells in each chunk that are mines")
+    parser.add_argument("--moves", type=int, default=2000,
+                        help="stop after this many moves")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(play(args.height, args.width, args.density,
+                          args.seed, args.moves), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Benchmarks for the hot paths of the projects, with stored baselines.
+
+Runs fixed, seeded workloads for tictactoe.minimax, logic.model_check and
+MinesweeperAI.add_knowledge and records for each one:
+
+    seconds     best wall time of several runs
+    peak_kb     peak memory allocated during one run, traced by tracemalloc
+    ops         operation counts of one run (positions generated, models
+                checked, sentences in the knowledge base, ...)
+
+Operation counts do not depend on the machine, so a change in them points at
+the algorithm rather than at noise. Timing and tracing happen in separate runs
+so that tracemalloc does not slow down the timed ones.
+
+Results are saved as a baseline file (JSON with a format version, the Python
+version, the platform and the git commit). A run can be checked against a
+baseline: any metric more than the threshold above it is a regression, and
+the run exits with status 1. Two saved baselines can be compared side by side.
+
+Usage:
+    python bench.py run [--save FILE] [--baseline FILE] [--threshold F] [--only NAME ...]
+    python bench.py compare OLD NEW
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Make the project modules importable from their directories
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "00-search", "projects", "tictactoe"))
+sys.path.insert(0, os.path.join(ROOT, "Lecture 01-Knowledge", "projects", "knights"))
+sys.path.insert(0, os.path.join(ROOT, "Lecture 01-Knowledge", "projects", "minesweeper"))
+
+import tictactoe as ttt
+from generator import generate
+from logic import model_check
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Format version of baseline files
+VERSION = 1
+
+# Default baseline, kept next to this file
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics compared against a baseline, besides the operation counts
+METRICS = ("seconds", "peak_kb")
+
+# String hash seed the workloads run under. model_check picks symbols from a
+# set, whose order follows the hashes of their names, so its work changes
+# from process to process unless hashing is fixed.
+HASH_SEED = "0"
+
+
+# -------------------------------
+# Workloads
+# -------------------------------
+
+@contextlib.contextmanager
+def counting(owner, name, counts, key):
+    """Counts calls to owner.name in counts[key] while the context is active."""
+    function = getattr(owner, name)
+
+    def counted(*args, **kwargs):
+        counts[key] += 1
+        return function(*args, **kwargs)
+
+    setattr(owner, name, counted)
+    try:
+        yield
+    finally:
+        setattr(owner, name, function)
+
+
+def minimax_workload(seed, count=False):
+    """Runs minimax from seeded positions with two moves played."""
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(4):
+        board = ttt.initial_state()
+        for _ in range(2):
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+        boards.append(board)
+
+    counts = {"searches": 0, "positions": 0}
+    with counting(ttt, "result", counts, "positions") if count else contextlib.nullcontext():
+        for board in boards:
+            ttt.minimax(board)
+            counts["searches"] += 1
+    return counts
+
+
+class Counted():
+    """Sentence wrapper that counts the models it is evaluated in."""
+
+    def __init__(self, sentence, counts):
+        self.sentence = sentence
+        self.counts = counts
+
+    def symbols(self):
+        return self.sentence.symbols()
+
+    def evaluate(self, model):
+        self.counts["models"] += 1
+        return self.sentence.evaluate(model)
+
+
+def model_check_workload(seed, count=False):
+    """Asks model_check every role of seeded six-character puzzles."""
+    counts = {"queries": 0, "entailed": 0, "models": 0}
+    for offset in range(2):
+        puzzle = generate(6, 9, 2, seed + offset)
+        knowledge = Counted(puzzle.knowledge, counts) if count else puzzle.knowledge
+        for query in puzzle.queries():
+            counts["queries"] += 1
+            counts["entailed"] += model_check(knowledge, query)
+    return counts
+
+
+def add_knowledge_workload(seed, count=False):
+    """
+Plays seeded beginner games, giving the AI every revealed cell through
+add_knowledge.
+    """
+    counts = {"games": 0, "add_knowledge": 0, "sentences": 0}
+    for offset in range(4):
+        game = Minesweeper(9, 9, 10, seed=seed + offset)
+        ai = MinesweeperAI(9, 9, seed=seed + offset)
+        while True:
+            move = ai.make_safe_move() or ai.make_random_move()
+            if move is None or game.is_mine(move):
+                break
+            for cell, nearby in game.reveal(move):
+                ai.add_knowledge(cell, nearby)
+                counts["add_knowledge"] += 1
+        counts["games"] += 1
+        counts["sentences"] += len(ai.knowledge)
+    return counts
+
+
+# Workloads: name -> function(seed, count) returning operation counts
+WORKLOADS = {
+    "minimax": minimax_workload,
+    "model_check": model_check_workload,
+    "add_knowledge": add_knowledge_workload,
+}
+
+
+# -------------------------------
+# Measuring
+# -------------------------------
+
+def measure(workload, seed, repeat):
+    """Returns the seconds, peak_kb and ops of one workload."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload(seed)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        workload(seed)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": round(seconds, 6), "peak_kb": round(peak / 1024, 1),
+            "ops": workload(seed, count=True)}
+
+
+def commit():
+    """Returns the current git commit of the repository, or None."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, seed, repeat):
+    """Measures the named workloads and returns a baseline dictionary."""
+    results = {}
+    for name in names:
+        results[name] = measure(WORKLOADS[name], seed, repeat)
+        print(f"{name}: {results[name]['seconds']:.3f} s", file=sys.stderr)
+    return {
+        "version": VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def load(path):
+    """Reads a baseline file, refusing other format versions."""
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != VERSION:
+        raise ValueError(f"{path} has baseline version {baseline.get('version')}, expected {VERSION}")
+    return baseline
+
+
+# -------------------------------
+# Comparing
+# -------------------------------
+
+def compare(old, new, threshold):
+    """
+Compares two baselines workload by workload.
+Returns rows of (workload, metric, old, new, ratio, regressed); a metric
+regresses when it grows by more than threshold, as a fraction of the old value.
+    """
+    rows = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        metrics = [(metric, before[metric], result[metric]) for metric in METRICS]
+        metrics += [(f"ops.{op}", before["ops"].get(op), value)
+                    for op, value in result["ops"].items()]
+        for metric, a, b in metrics:
+            if a is None:
+                continue
+            ratio = b / a if a else (1.0 if b == a else float("inf"))
+            rows.append((name, metric, a, b, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(rows, old_label, new_label):
+    """Prints comparison rows as a table."""
+    print(f"{'workload':14} {'metric':22} {old_label[:12]:>12} {new_label[:12]:>12} {'change':>8}")
+    for name, metric, a, b, ratio, regressed in rows:
+        change = f"{(ratio - 1) * 100:+.1f}%" if ratio != float("inf") else "new"
+        print(f"{name:14} {metric:22} {a:>12} {b:>12} {change:>8}"
+              + ("  REGRESSION" if regressed else ""))
+
+
+def label(baseline, fallback):
+    return baseline.get("commit") or fallback
+
+
+def main():
+    if os.environ.get("PYTHONHASHSEED") != HASH_SEED:
+        os.execve(sys.executable, [sys.executable] + sys.argv,
+                  {**os.environ, "PYTHONHASHSEED": HASH_SEED})
+
+    parser = argparse.ArgumentParser(description="Benchmark the projects' hot paths against a baseline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the workloads, optionally checking a baseline")
+    run_parser.add_argument("--only", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="timed runs per workload; the best one counts")
+    run_parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    run_parser.add_argument("--baseline", metavar="FILE",
+                            help=f"check against this baseline (default {os.path.basename(BASELINE)} if present)")
+    run_parser.add_argument("--no-baseline", action="store_true", help="do not check any baseline")
+    run_parser.add_argument("--threshold", type=float, default=0.3,
+                            help="allowed growth of any metric, as a fraction")
+
+    compare_parser = commands.add_parser("compare", help="show two baselines side by side")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.3)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "compare":
+            old, new = load(args.old), load(args.new)
+            rows = compare(old, new, args.threshold)
+            print_comparison(rows, label(old, "old"), label(new, "new"))
+            sys.exit(1 if any(row[-1] for row in rows) else 0)
+
+        baseline_path = None if args.no_baseline else args.baseline
+        if baseline_path is None and not args.no_baseline and os.path.exists(BASELINE):
+            baseline_path = BASELINE
+        baseline = load(baseline_path) if baseline_path else None
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot read baseline: {e}")
+
+    results = run(args.only, args.seed, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if baseline is None:
+        print(json.dumps(results["results"], indent=2))
+        return
+    if baseline.get("seed") != args.seed:
+        sys.exit(f"Baseline was recorded with seed {baseline.get('seed')}, not {args.seed}")
+
+    rows = compare(baseline, results, args.threshold)
+    print_comparison(rows, label(baseline, "baseline"), "current")
+    regressed = any(row[-1] for row in rows)
+    print("FAIL" if regressed else "PASS", file=sys.stderr)
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Load generator for the local game server.
+
+Opens many concurrent client connections, each playing games back to back,
+and reports throughput, client-side latency percentiles, busy rejections and
+the server's own metrics.
+
+Usage: python loadgen.py [--clients N] [--duration SECONDS] [--tictactoe FRACTION]
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+
+from server import HOST, PORT
+
+# Longest wait before retrying a request the server rejected as busy
+MAX_BACKOFF = 0.5
+
+
+class Client():
+    """One connection to the server that plays random games."""
+
+    def __init__(self, reader, writer, rng, stats):
+        self.reader = reader
+        self.writer = writer
+        self.rng = rng
+        self.stats = stats
+        self.ids = 0
+
+    async def request(self, **request):
+        """
+Sends a request and waits for its reply, recording latency.
+Requests rejected as busy are retried with exponential backoff.
+        """
+        backoff = 0.01
+        while True:
+            self.ids += 1
+            request["id"] = self.ids
+            start = time.perf_counter()
+            self.writer.write((json.dumps(request) + "\n").encode())
+            await self.writer.drain()
+            reply = json.loads(await self.reader.readline())
+            self.stats.latencies[request["op"]].append(time.perf_counter() - start)
+            if not reply.get("busy"):
+                break
+            self.stats.busy += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+        if "error" in reply:
+            self.stats.errors += 1
+        return reply
+
+    async def play_tictactoe(self):
+        """Plays random moves as X until the game ends."""
+        session = (await self.request(op="new", game="tictactoe"))["session"]
+        state = await self.request(op="state", session=session)
+        while not state.get("terminal", True):
+            board = state["board"]
+            empty = [(i, j) for i in range(3) for j in range(3) if board[i][j] is None]
+            state = await self.request(op="move", session=session,
+                                       action=self.rng.choice(empty))
+            if "error" in state:
+                break
+        await self.request(op="close", session=session)
+
+    async def play_minesweeper(self, height, width, mines):
+        """Lets the server's AI play until the game ends."""
+        session = (await self.request(op="new", game="minesweeper",
+                                      height=height, width=width, mines=mines))["session"]
+        while True:
+            reply = await self.request(op="ai", session=session)
+            if "error" in reply or reply["lost"] or reply["won"] or reply["move"] is None:
+                break
+        await self.request(op="close", session=session)
+
+
+class Stats():
+    """Measurements shared by all clients."""
+
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.games = 0
+        self.busy = 0
+        self.errors = 0
+
+
+async def client_loop(args, seed, stats, deadline):
+    """Plays games on one connection until the deadline passes."""
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    client = Client(reader, writer, random.Random(seed), stats)
+    while time.perf_counter() < deadline:
+        if client.rng.random() < args.tictactoe:
+            await client.play_tictactoe()
+        else:
+            await client.play_minesweeper(args.height, args.width, args.mines)
+        stats.games += 1
+    writer.close()
+
+
+async def run(args):
+    """Runs all clients concurrently and returns the combined report."""
+    stats = Stats()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(client_loop(args, args.seed + n, stats, deadline)
+                           for n in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    # Ask the server for its own view of the run
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(b'{"op": "metrics"}\n')
+    await writer.drain()
+    server_metrics = json.loads(await reader.readline())
+    writer.close()
+
+    requests = sum(len(samples) for samples in stats.latencies.values())
+    report = {
+        "clients": args.clients,
+        "elapsed": round(elapsed, 3),
+        "games": stats.games,
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 1),
+        "busy_rejections": stats.busy,
+        "errors": stats.errors,
+        "latency_ms": {},
+        "server": server_metrics,
+    }
+    for op, samples in sorted(stats.latencies.items()):
+        samples.sort()
+        report["latency_ms"][op] = {
+            "p50": round(1000 * samples[len(samples) // 2], 3),
+            "p99": round(1000 * samples[int(len(samples) * 0.99)], 3),
+            "max": round(1000 * samples[-1], 3),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against the game server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10,
+                        help="seconds to keep starting new games")
+    parser.add_argument("--tictactoe", type=float, default=0.1,
+                        help="fraction of games that are tictactoe")
+    parser.add_argument("--height", type=int, default=16)
+    parser.add_argument("--width", type=int, default=16)
+    parser.add_argument("--mines", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""
+Local asyncio game server hosting many tictactoe and Minesweeper sessions.
+
+Clients connect over TCP on localhost and exchange line-delimited JSON. Each
+request is an object with an "op" field and an optional "id" that is echoed
+back in the reply:
+
+    {"op": "new", "game": "tictactoe"}
+    {"op": "new", "game": "minesweeper", "height": 8, "width": 8, "mines": 8}
+    {"op": "move", "session": S, "action": [i, j]}   tictactoe: play, AI replies
+    {"op": "reveal", "session": S, "cell": [i, j]}   minesweeper: reveal a cell
+    {"op": "ai", "session": S}                       minesweeper: AI makes a move
+    {"op": "state", "session": S}
+    {"op": "close", "session": S}
+    {"op": "metrics"}
+
+CPU-heavy work runs in worker processes so the event loop stays responsive.
+Each Minesweeper worker is a single-process pool; a board and its AI are
+created inside one worker and stay there for the whole game, so a move only
+sends a cell and a small state dictionary across the process boundary.
+Tictactoe is stateless and sends its 3x3 board to minimax in a separate
+shared search pool, so a long search never queues behind, or in front of,
+the Minesweeper games pinned to a worker.
+
+When too many jobs are waiting for the workers, requests are rejected with a
+"busy" error instead of queueing without limit. Boards larger than max-cells
+are refused. Idle sessions are evicted after a timeout, and the least recently
+used session is evicted when the session limit is reached.
+
+Usage: python server.py [--port N] [--workers N] [--search-workers N]
+                        [--max-sessions N] [--max-cells N]
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Make the game modules importable from their project directories
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "00-search", "projects", "tictactoe"))
+sys.path.insert(0, os.path.join(ROOT, "Lecture 01-Knowledge", "projects", "minesweeper"))
+
+import tictactoe as ttt
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Default server settings
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_SESSIONS = 1000
+IDLE_TIMEOUT = 300
+MAX_PENDING = 64
+MAX_CELLS = 100_000
+
+# Number of recent latencies kept per operation for percentiles
+LATENCY_SAMPLES = 10000
+
+
+class Busy(Exception):
+    """Raised when the worker processes have too many jobs waiting."""
+
+
+def tictactoe_reply(board):
+    """Runs minimax in a worker process and returns the AI's action."""
+    return ttt.minimax(board)
+
+
+class MinesweeperGame():
+    """
+A Minesweeper board and its AI, living inside a worker process.
+"""
+
+    def __init__(self, height, width, mines, use_solver):
+        self.board = Minesweeper(height=height, width=width, mines=mines)
+        self.ai = MinesweeperAI(height=height, width=width, use_solver=use_solver)
+        self.safe_cells = height * width - mines
+        self.lost = False
+        self.revealed = 0
+
+    def reveal(self, cell):
+        """Reveals a cell and updates the AI's knowledge."""
+        if self.lost:
+            raise ValueError("game is over")
+        if self.board.is_mine(cell):
+            self.lost = True
+            return self.state()
+        opened = self.board.reveal(cell)
+        if opened:
+            self.revealed += len(opened)
+            self.ai.add_knowledge_batch(opened)
+        return self.state()
+
+    def ai_move(self):
+        """Lets the AI choose a cell and reveals it."""
+        if self.lost:
+            raise ValueError("game is over")
+        move = self.ai.make_safe_move() or self.ai.make_random_move()
+        state = self.reveal(move) if move is not None else self.state()
+        state["move"] = move
+        return state
+
+    def state(self):
+        return {
+            "lost": self.lost,
+            "won": self.revealed == self.safe_cells,
+            "revealed": self.revealed,
+            "known_mines": len(self.ai.mines),
+        }
+
+
+# Minesweeper games owned by this worker process, by session id
+WORKER_GAMES = {}
+
+
+def minesweeper_new(key, height, width, mines, use_solver):
+    """Creates a game in the worker process and returns its state."""
+    game = WORKER_GAMES[key] = MinesweeperGame(height, width, mines, use_solver)
+    return game.state()
+
+
+def minesweeper_call(key, method, *args):
+    """Calls a method of a game held by the worker process."""
+    game = WORKER_GAMES.get(key)
+    if game is None:
+        raise KeyError(f"no game {key} in worker")
+    return getattr(game, method)(*args)
+
+
+def minesweeper_close(key):
+    """Forgets a game held by the worker process."""
+    WORKER_GAMES.pop(key, None)
+
+
+class TictactoeSession():
+    """A tictactoe game where the client plays X and the server's AI plays O."""
+
+    game = "tictactoe"
+    ops = {"move": "move"}
+
+    def __init__(self, key, request, server):
+        self.key = key
+        self.board = ttt.initial_state()
+
+    async def start(self, server):
+        """Tictactoe keeps its board here, so there is nothing to set up in a worker."""
+
+    def close(self, server):
+        """Nothing to free in the workers."""
+
+    async def move(self, server, request):
+        """Plays the client's move, then the AI's reply."""
+        if ttt.terminal(self.board):
+            raise ValueError("game is over")
+        server.check_capacity()
+        self.board = ttt.result(self.board, tuple(request["action"]))
+        if not ttt.terminal(self.board):
+            action = await server.offload(server.search, tictactoe_reply, self.board)
+            self.board = ttt.result(self.board, action)
+        return self.state()
+
+    def state(self):
+        return {
+            "board": self.board,
+            "terminal": ttt.terminal(self.board),
+            "winner": ttt.winner(self.board),
+        }
+
+
+class MinesweeperSession():
+    """
+A Minesweeper board with an AI that learns from every reveal.
+The board and AI live in one worker process (see MinesweeperGame); this side
+only validates requests and keeps the latest state for "state" requests.
+"""
+
+    game = "minesweeper"
+    ops = {"reveal": "reveal", "ai": "ai_move"}
+
+    def __init__(self, key, request, server):
+        self.key = key
+        self.height = integer(request, "height", 8)
+        self.width = integer(request, "width", 8)
+        self.mines = integer(request, "mines", 8)
+        self.use_solver = bool(request.get("solver", True))
+        cells = self.height * self.width
+        if self.height < 1 or self.width < 1:
+            raise ValueError("board must have at least one row and column")
+        if cells > server.max_cells:
+            raise ValueError(f"board has {cells} cells, more than the limit of {server.max_cells}")
+        if not 0 <= self.mines < cells:
+            raise ValueError(f"mines must be between 0 and {cells - 1}")
+        self.last_state = None
+
+    async def start(self, server):
+        """Builds the board and AI in the session's worker."""
+        self.last_state = await server.offload(
+            server.worker(self.key), minesweeper_new, self.key,
+            self.height, self.width, self.mines, self.use_solver,
+        )
+
+    def close(self, server):
+        """Frees the game in the worker without waiting for it."""
+        server.worker(self.key).submit(minesweeper_close, self.key)
+
+    async def reveal(self, server, request):
+        """Reveals a cell and updates the AI's knowledge in the worker."""
+        cell = request.get("cell")
+        if (not isinstance(cell, list) or len(cell) != 2
+                or not all(type(x) is int for x in cell)):
+            raise ValueError("cell must be a list of two integers")
+        if not (0 <= cell[0] < self.height and 0 <= cell[1] < self.width):
+            raise ValueError(f"cell {cell} is not on the board")
+        return await self.call(server, "reveal", tuple(cell))
+
+    async def ai_move(self, server, request):
+        """Lets the AI choose a cell and reveals it."""
+        return await self.call(server, "ai_move")
+
+    async def call(self, server, method, *args):
+        if self.last_state["lost"]:
+            raise ValueError("game is over")
+        state = await server.offload(server.worker(self.key), minesweeper_call,
+                                     self.key, method, *args)
+        self.last_state = {k: v for k, v in state.items() if k != "move"}
+        return state
+
+    def state(self):
+        return dict(self.last_state)
+
+
+def integer(request, field, default):
+    """Reads an integer field of a request, rejecting other types."""
+    value = request.get(field, default)
+    if type(value) is not int:
+        raise ValueError(f"{field} must be an integer")
+    return value
+
+
+GAMES = {
+    "tictactoe": TictactoeSession,
+    "minesweeper": MinesweeperSession,
+}
+
+
+class Metrics():
+    """Request counts and recent latencies per operation."""
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.errors = collections.Counter()
+        self.latencies = collections.defaultdict(
+            lambda: collections.deque(maxlen=LATENCY_SAMPLES)
+        )
+
+    def record(self, op, seconds, ok):
+        self.counts[op] += 1
+        if not ok:
+            self.errors[op] += 1
+        self.latencies[op].append(seconds)
+
+    def summary(self):
+        report = {}
+        for op, samples in self.latencies.items():
+            ordered = sorted(samples)
+            report[op] = {
+                "count": self.counts[op],
+                "errors": self.errors[op],
+                "p50_ms": round(1000 * ordered[len(ordered) // 2], 3),
+                "p99_ms": round(1000 * ordered[int(len(ordered) * 0.99)], 3),
+                "max_ms": round(1000 * ordered[-1], 3),
+            }
+        return report
+
+
+class GameServer():
+    """
+Holds the sessions, the process pool and the metrics for one server.
+"""
+
+    def __init__(self, workers=None, max_sessions=MAX_SESSIONS,
+                 idle_timeout=IDLE_TIMEOUT, max_pending=MAX_PENDING,
+                 max_cells=MAX_CELLS, search_workers=None):
+        # One single-process pool per worker, so a Minesweeper session always
+        # reaches the process that holds its game
+        self.workers = [ProcessPoolExecutor(max_workers=1)
+                        for _ in range(workers or os.cpu_count())]
+
+        # Stateless tictactoe searches go to any free process of a shared pool
+        self.search = ProcessPoolExecutor(max_workers=search_workers or os.cpu_count())
+        self.max_cells = max_cells
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_pending = max_pending
+        self.pending = 0
+        self.sessions = collections.OrderedDict()   # id -> [session, last used, lock]
+        self.ids = itertools.count(1)
+        self.evicted = 0
+        self.metrics = Metrics()
+
+    def check_capacity(self):
+        """
+Raises Busy if max_pending worker jobs are already queued or running.
+Sessions call this before changing any state, so a rejected request leaves
+the game untouched.
+        """
+        if self.pending >= self.max_pending:
+            raise Busy("server busy, retry later")
+
+    def worker(self, key):
+        """Returns the worker process pool that holds a Minesweeper session's game."""
+        return self.workers[key % len(self.workers)]
+
+    async def offload(self, executor, function, *args):
+        """
+Runs a function in a process pool, either a session's worker or the search
+pool, subject to check_capacity.
+        """
+        self.check_capacity()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, function, *args)
+        finally:
+            self.pending -= 1
+
+    def remove(self, key):
+        """Drops a session and frees anything it holds in its worker."""
+        session = self.sessions.pop(key)[0]
+        session.close(self)
+
+    def evict_idle(self):
+        """Removes sessions unused for longer than the idle timeout."""
+        cutoff = time.monotonic() - self.idle_timeout
+        while self.sessions:
+            key, (_, last_used, _) = next(iter(self.sessions.items()))
+            if last_used > cutoff:
+                break
+            self.remove(key)
+            self.evicted += 1
+
+    async def evict_periodically(self):
+        while True:
+            await asyncio.sleep(max(1, self.idle_timeout / 10))
+            self.evict_idle()
+
+    async def create(self, request):
+        """Creates a session, evicting the least recently used one if full."""
+        game = GAMES.get(request.get("game"))
+        if game is None:
+            raise ValueError(f"unknown game {request.get('game')}")
+        key = next(self.ids)
+        session = game(key, request, self)
+        await session.start(self)
+        while len(self.sessions) >= self.max_sessions:
+            self.remove(next(iter(self.sessions)))
+            self.evicted += 1
+        self.sessions[key] = [session, time.monotonic(), asyncio.Lock()]
+        return {"session": key, "game": game.game}
+
+    def lookup(self, request):
+        """Returns the session entry for a request and marks it as recently used."""
+        key = request.get("session")
+        entry = self.sessions.get(key)
+        if entry is None:
+            raise KeyError(f"no session {key}")
+        entry[1] = time.monotonic()
+        self.sessions.move_to_end(key)
+        return entry
+
+    async def handle(self, request):
+        """Dispatches one request and returns the reply."""
+        op = request.get("op")
+        if op == "new":
+            return await self.create(request)
+        if op == "metrics":
+            return {
+                "sessions": len(self.sessions),
+                "evicted": self.evicted,
+                "pending": self.pending,
+                "operations": self.metrics.summary(),
+            }
+        if op == "close":
+            self.lookup(request)
+            self.remove(request["session"])
+            return {"closed": request["session"]}
+
+        session, _, lock = self.lookup(request)
+        if op == "state":
+            return session.state()
+        if op not in session.ops:
+            raise ValueError(f"unknown op {op} for {session.game}")
+        method = getattr(session, session.ops[op])
+
+        # Requests on the same session are applied one at a time
+        async with lock:
+            return await method(self, request)
+
+    async def serve_client(self, reader, writer):
+        """Reads requests from a connection and answers them in order."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                request = None
+                try:
+                    request = json.loads(line)
+                    reply = await self.handle(request)
+                    ok = True
+                except Busy as e:
+                    reply, ok = {"error": str(e), "busy": True}, False
+                except Exception as e:
+                    reply, ok = {"error": str(e)}, False
+
+                if not isinstance(request, dict):
+                    request = {"op": "invalid"}
+                self.metrics.record(str(request.get("op")), time.perf_counter() - start, ok)
+                if "id" in request:
+                    reply["id"] = request["id"]
+                writer.write((json.dumps(reply) + "\n").encode())
+                # Stop reading until the client has taken the reply
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.serve_client, host, port)
+        evictor = asyncio.create_task(self.evict_periodically())
+        print(f"Serving on {host}:{port}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+            for worker in self.workers + [self.search]:
+                worker.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host tictactoe and Minesweeper AI sessions.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes holding Minesweeper games")
+    parser.add_argument("--search-workers", type=int, default=os.cpu_count(),
+                        help="processes in the shared pool for tictactoe minimax")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="seconds before an unused session is evicted")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING,
+                        help="worker jobs allowed in flight before rejecting requests")
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="largest Minesweeper board accepted, in cells")
+    args = parser.parse_args()
+
+    server = GameServer(args.workers, args.max_sessions,
+                        args.idle_timeout, args.max_pending, args.max_cells,
+                        args.search_workers)
+    try:
+        asyncio.run(server.run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()